@@ -26,25 +26,78 @@ import re
 import random
 from datetime import datetime as dt
 import base64
+import io
+import multiprocessing
 
 # Add parent directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # Try to import the resume parser, fallback to simple text extraction if not available
 try:
-    from pyresparser.resume_parser import ResumeParser
+    from pyresparser import batch
+    from pyresparser.budget import Budget, BudgetExceeded
+    # Re-uploads and Streamlit reruns of the same file reuse the cached parse
+    RESUME_CACHE_PATH = 'resume_cache.db'
+    # Keep one pathological upload from freezing the session. The timeouts
+    # only fire on a process's main thread, never on Streamlit's script
+    # thread, so uploads are parsed in a worker process (see parse_upload).
+    UPLOAD_BUDGET = Budget(max_bytes=10 * 1024 * 1024, max_pages=20, max_chars=200000,
+                           extract_timeout=30, nlp_timeout=30)
+    # Kill the worker if a parse still has not returned after this long,
+    # e.g. stuck in native code the timeouts cannot interrupt
+    UPLOAD_TIMEOUT = 90
     RESUME_PARSER_AVAILABLE = True
 except ImportError:
     RESUME_PARSER_AVAILABLE = False
     st.warning("Advanced resume parsing not available. Using basic text extraction.")
 
-try:
-    import nltk
-    nltk.download('stopwords', quiet=True)
-    nltk.download('punkt', quiet=True)
-    nltk.download('wordnet', quiet=True)
-except ImportError:
-    pass
+# Upload types handed to ResumeParser; anything else is read as plain text
+PARSEABLE_UPLOAD_TYPES = (
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+)
+
+@st.experimental_singleton
+def get_parser_pool():
+    # one warm worker process shared by all sessions; spawned, as forking
+    # the multi-threaded Streamlit server is unsafe
+    return batch.create_pool(
+        processes=1,
+        start_method='spawn',
+        preload=False,
+        cache_path=RESUME_CACHE_PATH,
+        budget=UPLOAD_BUDGET,
+        tiered=True,
+        fields='details',
+    )
+
+
+def parse_upload(uploaded_file):
+    """Parse an upload in the worker process, enforcing UPLOAD_BUDGET"""
+    # a plain named BytesIO pickles to the worker; Streamlit's UploadedFile
+    # may not, and the parser reads either in memory without a disk copy
+    upload = io.BytesIO(uploaded_file.getvalue())
+    upload.name = uploaded_file.name
+    pool = get_parser_pool()
+    try:
+        data = pool.apply_async(batch.parse_resume, (upload,)).get(timeout=UPLOAD_TIMEOUT)
+    except multiprocessing.TimeoutError:
+        pool.terminate()
+        get_parser_pool.clear()
+        raise BudgetExceeded('upload_timeout', UPLOAD_TIMEOUT)
+    if 'error' in data:
+        raise RuntimeError(data['error'])
+    return data
+
+
+def parser_cache_stats():
+    """Result cache counters of the worker process, which does the parsing"""
+    try:
+        return get_parser_pool().apply_async(batch.cache_stats).get(timeout=5)
+    except multiprocessing.TimeoutError:
+        # the worker is busy with a parse
+        return None
+
 
 # --- Database Setup ---
 def init_database():
@@ -416,19 +469,15 @@ if choice == "🏠 User Dashboard":
 
     if uploaded_file is not None and act_name.strip() and act_mail.strip():
         # Read file content
-        if uploaded_file.type == "application/pdf":
-            # For PDF files, save and process
-            with open("uploaded_resume.pdf", "wb") as f:
-                f.write(uploaded_file.read())
-
+        if uploaded_file.type in PARSEABLE_UPLOAD_TYPES:
+            # parse_upload copies the upload's bytes into the parser worker
+            # process, where the upload budget's timeouts can fire
             with st.spinner('🔍 Analyzing your resume...'):
                 if RESUME_PARSER_AVAILABLE:
                     try:
-                        data = ResumeParser("uploaded_resume.pdf").get_extracted_data()
-                        # Read text for additional analysis
-                        with open("uploaded_resume.pdf", "rb") as f:
-                            # Simple text extraction fallback
-                            resume_text = str(uploaded_file.getvalue())
+                        data = parse_upload(uploaded_file)
+                        # Simple text extraction fallback for additional analysis
+                        resume_text = str(uploaded_file.getvalue())
                         st.success("✅ Advanced AI parsing completed!")
                     except Exception as e:
                         st.warning(f"⚠️ Advanced parsing failed: {str(e)[:100]}... Using fallback method.")
@@ -700,6 +749,16 @@ elif choice == "👨‍💼 Admin Panel":
                 avg_rating = feedback_df['rating'].mean() if not feedback_df.empty else 0
                 st.metric("⭐ Avg Rating", f"{avg_rating:.1f}")
 
+            cache_stats = parser_cache_stats() if RESUME_PARSER_AVAILABLE else None
+            if cache_stats is not None:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("⚡ Parser Cache Hits", cache_stats['memory_hits'] + cache_stats['disk_hits'])
+                with col2:
+                    st.metric("🐢 Parser Cache Misses", cache_stats['misses'])
+                with col3:
+                    st.metric("🎯 Cache Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+
             # Tabs for different views
             tab1, tab2, tab3, tab4 = st.tabs(["📊 Analytics", "👥 User Data", "💬 Feedback", "📈 Charts"])
 
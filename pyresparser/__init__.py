@@ -1,9 +1,35 @@
-from . import utils
-from . import constants
-from .resume_parser import ResumeParser
+import importlib
+
+__version__ = '1.0.6'
+
+# Public names, imported on first access so that `import pyresparser` stays
+# cheap; the parser itself pulls in spaCy and pdfminer when it needs them.
+_LAZY = {
+    'utils': ('.utils', None),
+    'constants': ('.constants', None),
+    'models': ('.models', None),
+    'ResumeParser': ('.resume_parser', 'ResumeParser'),
+    'parse_batch': ('.resume_parser', 'parse_batch'),
+}
 
 __all__ = [
     'utils',
     'constants',
-    'ResumeParser'
+    'models',
+    'ResumeParser',
+    'parse_batch'
 ]
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY[name]
+    module = importlib.import_module(module_name, __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
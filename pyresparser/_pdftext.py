@@ -0,0 +1,45 @@
+# Author: Resume Analyzer Fast PDF Text
+#
+# Imported by utils on first use of the 'fast' PDF profile, so pdfminer
+# stays out of `import pyresparser`.
+
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LTChar, LTContainer
+
+# gap between two characters, relative to their size, that separates words
+# (pdfminer's LAParams.word_margin)
+WORD_MARGIN = 0.1
+
+
+def _chars(item):
+    # LTChars in content-stream order, descending into figures
+    for child in item:
+        if isinstance(child, LTChar):
+            yield child
+        elif isinstance(child, LTContainer):
+            yield from _chars(child)
+
+
+class FastTextConverter(TextConverter):
+    '''
+    TextConverter without layout analysis: characters come out in content-
+    stream order, with a line break wherever the baseline moves and a space
+    wherever a gap opens between two characters on the same line, so words
+    and lines stay apart as they do with analysis. Use with laparams=None.
+    '''
+
+    def receive_layout(self, ltpage):
+        previous = None
+        for char in _chars(ltpage):
+            text = char.get_text()
+            if previous is not None and not text.isspace() and not previous.get_text().isspace():
+                if abs(char.y0 - previous.y0) > min(char.height, previous.height) / 2:
+                    self.write_text('\n')
+                else:
+                    margin = WORD_MARGIN * max(char.width, char.height)
+                    # a gap, or a jump back to the left (e.g. the next column)
+                    if char.x0 - previous.x1 > margin or char.x1 < previous.x0:
+                        self.write_text(' ')
+            self.write_text(text)
+            previous = char
+        self.write_text('\n\f')
@@ -0,0 +1,14 @@
+# Imported by the forkserver process (see batch.create_pool) so that the
+# spaCy model is loaded once there and every forked worker shares its pages.
+import os
+
+from . import bundle
+from . import models
+
+if os.environ.get('PYRESPARSER_PRELOAD_BUNDLE'):
+    bundle.load_bundle(os.environ['PYRESPARSER_PRELOAD_BUNDLE'])
+exclude = os.environ.get('PYRESPARSER_PRELOAD_EXCLUDE', '')
+models.warm_up(
+    os.environ.get('PYRESPARSER_PRELOAD_MODEL', models.DEFAULT_MODEL),
+    exclude=tuple(pipe for pipe in exclude.split(',') if pipe),
+)
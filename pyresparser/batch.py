@@ -0,0 +1,633 @@
+# Author: Resume Analyzer Batch Runner
+
+import argparse
+import gc
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from collections import Counter, deque
+
+from . import bundle
+from . import cache
+from . import converters
+from . import models
+from . import skills
+from . import utils
+from .manifest import Manifest
+from .budget import Budget
+from .resume_parser import MODES, ResumeParser, _error_result, _resume_label
+
+# per-worker ResumeParser keyword arguments installed by the pool initializer
+_worker_options = {}
+
+
+def _init_worker(model_name, cache_path, parser_options, bundle_path=None):
+    '''
+    Pool initializer: load the spaCy model and skills index once per worker
+    process, from `bundle_path` when given. With a preloaded parent these
+    are no-op lookups in what the worker inherited. Lite-mode workers never
+    load the model.
+    '''
+    if bundle_path:
+        bundle.load_bundle(bundle_path)
+    if parser_options.get('mode', 'full') != 'lite':
+        models.warm_up(model_name, models.excluded_pipes(parser_options.get('fields')))
+    skills.matcher_for(parser_options.get('skills_file'))
+    if cache_path:
+        cache.configure(cache_path)
+    _worker_options.update(parser_options)
+
+
+def _task_path(task):
+    return task[0] if isinstance(task, tuple) else task
+
+
+def parse_resume(task):
+    '''
+    Pool task: parse one resume with the worker's warm model, returning an
+    error dictionary instead of raising so one bad file cannot fail a batch.
+    `task` is a path or a named in-memory file, or (path, ConversionResult)
+    for a file whose text was already produced by an external converter.
+    '''
+    resume, text = task, None
+    if isinstance(task, tuple):
+        resume, conversion = task
+        if conversion.error:
+            return {'error': f"Conversion failed: {conversion.error}", 'file': resume}
+        text = conversion.text
+    try:
+        parser = ResumeParser(resume, text=text, **_worker_options)
+        return dict(parser.get_extracted_data(), file=_resume_label(resume))
+    except Exception as e:
+        return _error_result(e, resume)
+
+
+def cache_stats():
+    '''
+    Pool task: the result cache counters of the worker that runs it
+    '''
+    return cache.stats()
+
+
+def create_pool(processes=None, start_method=None, preload=True, maxtasksperchild=None,
+                model_name=models.DEFAULT_MODEL, cache_path=None, bundle_path=None, **parser_options):
+    '''
+    Create a process pool whose workers keep the spaCy model loaded.
+
+    With preload=True the model is loaded before workers are forked so they
+    share its pages copy-on-write: under 'fork' the parent loads it, under
+    'forkserver' the server process does. maxtasksperchild recycles workers
+    after that many resumes to bound pdfminer memory growth. With
+    `cache_path`, workers share an SQLite result cache at that path.
+    With `bundle_path`, the model and skills index come from a bundle
+    built by pyresparser.bundle instead; its model and field profile must
+    match `model_name` and the `fields` option for the workers to use it.
+    Remaining keyword arguments are passed to every ResumeParser, along
+    with `model_name` as its model.
+    '''
+    ctx = mp.get_context(start_method)
+    method = ctx.get_start_method()
+    lite = parser_options.get('mode', 'full') == 'lite'
+    exclude = models.excluded_pipes(parser_options.get('fields'))
+
+    if preload and method == 'fork':
+        if bundle_path:
+            bundle.load_bundle(bundle_path)
+        if not lite:
+            models.warm_up(model_name, exclude)
+        skills.matcher_for(parser_options.get('skills_file'))
+        # keep the loaded objects out of the collector so refcount-free
+        # gc passes in the children do not dirty the shared pages
+        gc.freeze()
+    elif preload and method == 'forkserver' and not lite:
+        os.environ['PYRESPARSER_PRELOAD_MODEL'] = model_name
+        os.environ['PYRESPARSER_PRELOAD_EXCLUDE'] = ','.join(exclude)
+        os.environ['PYRESPARSER_PRELOAD_BUNDLE'] = bundle_path or ''
+        ctx.set_forkserver_preload(['pyresparser._preload'])
+
+    return ctx.Pool(
+        processes or mp.cpu_count(),
+        initializer=_init_worker,
+        initargs=(model_name, cache_path, dict(parser_options, model=model_name), bundle_path),
+        maxtasksperchild=maxtasksperchild,
+    )
+
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+
+def iter_resumes(resumes_dir, extensions=RESUME_EXTENSIONS):
+    '''
+    Lazily walk `resumes_dir`, yielding resume paths as they are found
+    '''
+    for root, dirs, files in os.walk(resumes_dir):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.lower().endswith(extensions):
+                yield os.path.join(root, filename)
+
+
+def imap_bounded(pool, func, items, max_in_flight, task_timeout=None):
+    '''
+    Like pool.imap_unordered, but never submits more than `max_in_flight`
+    tasks ahead of the consumer, so neither the input iterator nor the
+    finished results pile up in memory. Results are yielded as they complete.
+
+    A Pool silently drops the task of a worker that dies (OOM killer, a
+    crash in native code). Tasks without a result `task_timeout` seconds
+    after submission are therefore given up and yield an error record;
+    a result arriving later is discarded.
+    '''
+    done = queue.Queue()
+    # task id -> (item, submission time), oldest first
+    in_flight = {}
+
+    def next_result():
+        while True:
+            timeout = None
+            if task_timeout is not None:
+                submitted = next(iter(in_flight.values()))[1]
+                timeout = max(0.0, submitted + task_timeout - time.monotonic())
+            try:
+                task_id, record = done.get(timeout=timeout)
+            except queue.Empty:
+                task_id, (item, _) = next(iter(in_flight.items()))
+                del in_flight[task_id]
+                return {'error': f"No result after {task_timeout}s; the worker died or hung",
+                        'file': _task_path(item)}
+            if in_flight.pop(task_id, None) is not None:
+                return record
+
+    for task_id, item in enumerate(items):
+        while len(in_flight) >= max_in_flight:
+            yield next_result()
+        in_flight[task_id] = (item, time.monotonic())
+        pool.apply_async(
+            func, (item,),
+            callback=lambda record, task_id=task_id: done.put((task_id, record)),
+            error_callback=lambda e, task_id=task_id, item=item: done.put(
+                (task_id, {'error': str(e), 'file': _task_path(item)})
+            ),
+        )
+
+    while in_flight:
+        yield next_result()
+
+
+class JsonLinesWriter:
+    '''
+    Write one JSON document per line, flushing each record as it arrives
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = open(path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        self._fh.write(json.dumps(record, ensure_ascii=False))
+        self._fh.write('\n')
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+    @staticmethod
+    def read(path):
+        '''
+        Yield the records of a file this writer produced, in order
+        '''
+        with open(path, encoding='utf-8') as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class JsonArrayWriter(JsonLinesWriter):
+    '''
+    Stream records into a single JSON array, the format of `output.json`
+    '''
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._fh.write('[')
+        self._count = 0
+
+    def write(self, record):
+        self._fh.write(',\n' if self._count else '\n')
+        self._fh.write(json.dumps(record, indent=4, ensure_ascii=False))
+        self._fh.flush()
+        self._count += 1
+
+    def close(self):
+        self._fh.write('\n]\n')
+        super().close()
+
+    @staticmethod
+    def read(path, chunk_size=1 << 16):
+        # streamed element by element, so memory is bounded by one record
+        decoder = json.JSONDecoder()
+        with open(path, encoding='utf-8') as fh:
+            buffer = fh.read(chunk_size).lstrip()
+            if not buffer.startswith('['):
+                raise ValueError(f"Not a JSON array: {path}")
+            buffer = buffer[1:]
+            eof = False
+            while True:
+                buffer = buffer.lstrip(' \t\r\n,')
+                if not buffer or buffer[0] == ']':
+                    if buffer or eof:
+                        return
+                else:
+                    try:
+                        record, end = decoder.raw_decode(buffer)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    else:
+                        yield record
+                        buffer = buffer[end:]
+                        continue
+                # the next record continues beyond the buffer
+                chunk = fh.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+
+
+class ParquetWriter:
+    '''
+    Write records to Parquet, one row group per `row_group_size` records.
+    Fields outside the known columns are kept as JSON in the `extra` column.
+    '''
+
+    COLUMNS = ('file', 'name', 'email', 'mobile_number', 'skills', 'degree', 'no_of_pages', 'error')
+
+    def __init__(self, path, row_group_size=500):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires the 'pyarrow' package.")
+
+        self._pa = pa
+        self.path = path
+        self.row_group_size = row_group_size
+        self._schema = pa.schema([
+            ('file', pa.string()),
+            ('name', pa.string()),
+            ('email', pa.string()),
+            ('mobile_number', pa.string()),
+            ('skills', pa.list_(pa.string())),
+            ('degree', pa.list_(pa.string())),
+            ('no_of_pages', pa.int32()),
+            ('error', pa.string()),
+            ('extra', pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._rows = []
+
+    def write(self, record):
+        row = {column: record.get(column) for column in self.COLUMNS}
+        extra = {k: v for k, v in record.items() if k not in self.COLUMNS}
+        row['extra'] = json.dumps(extra, ensure_ascii=False) if extra else None
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+            self._writer.write_table(table)
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+    @classmethod
+    def read(cls, path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                extra = row.pop('extra')
+                if row['error'] is None:
+                    del row['error']
+                if extra:
+                    row.update(json.loads(extra))
+                yield row
+
+
+WRITERS = {
+    'json': JsonArrayWriter,
+    'jsonl': JsonLinesWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def read_records(path):
+    '''
+    Yield the records of a file written by any of WRITERS, telling its
+    format from its content, so an output can be read back whatever
+    format the next run writes
+    '''
+    with open(path, 'rb') as fh:
+        head = fh.read(64).lstrip()
+    if head.startswith(b'PAR1'):
+        return ParquetWriter.read(path)
+    if head.startswith(b'['):
+        return JsonArrayWriter.read(path)
+    return JsonLinesWriter.read(path)
+
+
+def open_writer(path, fmt=None):
+    '''
+    Open an incremental result writer, picking the format from the file
+    extension when `fmt` is not given
+    '''
+    if fmt is None:
+        fmt = os.path.splitext(path)[1].lstrip('.').lower() or 'jsonl'
+    try:
+        return WRITERS[fmt](path)
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {fmt}")
+
+
+class Progress:
+    '''
+    Periodically report processed count, failures and throughput
+    '''
+
+    def __init__(self, interval=5.0, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        # budget limits hit across all workers, from the result records
+        self.budget_violations = Counter()
+        self._started = time.perf_counter()
+        self._last_report = self._started
+
+    def update(self, record):
+        self.done += 1
+        if 'error' in record:
+            self.failed += 1
+        self.budget_violations.update(record.get('budget_exceeded', ()))
+        now = time.perf_counter()
+        if self.interval is not None and now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def skip(self):
+        self.skipped += 1
+
+    def rate(self):
+        elapsed = time.perf_counter() - self._started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def report(self):
+        print(f"{self.done} resumes processed ({self.failed} failed, "
+              f"{self.skipped} unchanged skipped), {self.rate():.1f} resumes/s", file=self.stream)
+        if self.budget_violations:
+            limits = ', '.join(f'{kind}: {count}' for kind, count in sorted(self.budget_violations.items()))
+            print(f"budget limits exceeded - {limits}", file=self.stream)
+
+
+def _convert_externally(resumes, converter_pool, max_pending):
+    '''
+    Start external conversions (antiword for .doc) in this process as soon
+    as such resumes are found and pass them on as (path, ConversionResult)
+    tasks once finished; other resumes pass straight through. Conversions
+    therefore overlap with NLP already running on the pool's workers.
+    '''
+    pending = deque()
+    for resume in resumes:
+        extension = os.path.splitext(resume)[1].lower()
+        if extension in converters.CONVERTERS:
+            pending.append((resume, converter_pool.submit(resume, extension)))
+        else:
+            yield resume
+        while pending and (pending[0][1].done() or len(pending) >= max_pending):
+            resume, future = pending.popleft()
+            yield resume, future.result()
+
+    while pending:
+        resume, future = pending.popleft()
+        yield resume, future.result()
+
+
+def _changed_resumes(resumes, manifest, previous_files, fingerprints, skipped, progress):
+    # yields new or modified resumes, and unchanged ones whose result is
+    # missing from the previous output, remembering their fingerprints so
+    # the result can be recorded once it has been written; the rest are
+    # collected in `skipped` for their results to be copied forward
+    for resume in resumes:
+        needs_parsing, fingerprint = manifest.fingerprint(resume)
+        if needs_parsing or resume not in previous_files:
+            fingerprints[resume] = fingerprint
+            yield resume
+        else:
+            skipped[resume] = fingerprint
+            progress.skip()
+
+
+def run_batch(resumes, writer, pool, max_in_flight=None, progress=None, manifest=None, converter_pool=None,
+              previous=None, task_timeout=None):
+    '''
+    Parse `resumes` on `pool`, writing each result to `writer` as soon as it
+    completes. Memory stays bounded by `max_in_flight` (default: two tasks
+    per CPU). With a Manifest, unchanged resumes that have a result in
+    `previous`, the last run's output in any of the WRITERS formats, are
+    skipped and their results copied forward from it; every result is
+    recorded against its position in the new output. With a
+    ConverterPool, .doc files are converted concurrently in this process.
+    Resumes without a result after `task_timeout` seconds are reported as
+    failed (see imap_bounded). Returns the Progress tracker.
+    '''
+    if max_in_flight is None:
+        max_in_flight = 2 * mp.cpu_count()
+    if progress is None:
+        progress = Progress()
+
+    fingerprints = {}
+    skipped = {}
+    if manifest is not None:
+        previous_files = set()
+        if previous is not None:
+            previous_files = {record.get('file') for record in read_records(previous)}
+        resumes = _changed_resumes(resumes, manifest, previous_files, fingerprints, skipped, progress)
+    if converter_pool is not None:
+        resumes = _convert_externally(resumes, converter_pool, max_in_flight)
+
+    position = 0
+    for record in imap_bounded(pool, parse_resume, resumes, max_in_flight, task_timeout):
+        writer.write(record)
+        fingerprint = fingerprints.pop(record.get('file'), None)
+        if fingerprint is not None:
+            if 'error' in record:
+                manifest.forget(record['file'])
+            else:
+                manifest.record(record['file'], fingerprint, writer.path, position)
+        position += 1
+        progress.update(record)
+
+    if skipped:
+        for record in read_records(previous):
+            fingerprint = skipped.pop(record.get('file'), None)
+            if fingerprint is not None:
+                writer.write(record)
+                manifest.record(record['file'], fingerprint, writer.path, position)
+                position += 1
+    return progress
+
+
+def _manifest_version(parser_options, model_name):
+    # results depend on the options as much as on the code: a re-run with
+    # other options parses every resume again
+    options = dict(parser_options, model=model_name)
+    exclude = models.excluded_pipes(options.pop('fields', None))
+    return cache.parser_version(custom_regex=None, exclude=exclude, **options)
+
+
+def _fields_arg(value):
+    try:
+        return models.parse_fields(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _build_arg_parser():
+    parser = argparse.ArgumentParser(description='Parse a folder of resumes in parallel.')
+    parser.add_argument('resumes_dir', nargs='?', default='resumes')
+    parser.add_argument('-o', '--output', default='output.json',
+                        help='.json, .jsonl or .parquet; written incrementally')
+    parser.add_argument('--format', choices=sorted(WRITERS), default=None)
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help='maximum resumes queued or being parsed at once')
+    parser.add_argument('--task-timeout', type=float, default=600,
+                        help='seconds after which a resume without a result counts as failed, '
+                             'e.g. when its worker was killed (0 waits forever)')
+    parser.add_argument('--progress-interval', type=float, default=5.0,
+                        help='seconds between progress reports')
+    parser.add_argument('-p', '--processes', type=int, default=None)
+    parser.add_argument('--start-method', choices=mp.get_all_start_methods(), default=None)
+    parser.add_argument('--no-preload', dest='preload', action='store_false',
+                        help='load the model in each worker instead of sharing it')
+    parser.add_argument('--maxtasksperchild', type=int, default=200,
+                        help='recycle a worker after this many resumes (0 disables)')
+    parser.add_argument('--skills-file', default=None)
+    parser.add_argument('--bundle', default=None,
+                        help='load the model and skills index from a pyresparser.bundle directory')
+    parser.add_argument('--pdf-profile', choices=utils.PDF_PROFILES, default=utils.DEFAULT_PDF_PROFILE,
+                        help='PDF layout analysis: fast skips it, layout is the most faithful')
+    parser.add_argument('--mode', choices=MODES, default='full',
+                        help='lite skips spaCy: no NER, the name is guessed from the first lines')
+    parser.add_argument('--fields', type=_fields_arg, default=None,
+                        help=f'profile ({", ".join(models.PROFILES)}) or comma-separated fields; '
+                             'only the spaCy components these need are loaded')
+    parser.add_argument('--tiered', action='store_true',
+                        help='take name and contact details from the header, running full NER only when needed')
+    parser.add_argument('--max-bytes', type=int, default=None, help='skip files larger than this')
+    parser.add_argument('--max-pages', type=int, default=None, help='only read the first pages of a PDF')
+    parser.add_argument('--max-chars', type=int, default=None, help='truncate text sent to spaCy')
+    parser.add_argument('--chunk-chars', type=int, default=None,
+                        help='run spaCy over longer texts in chunks of this size')
+    parser.add_argument('--extract-timeout', type=float, default=None, help='seconds for text extraction')
+    parser.add_argument('--nlp-timeout', type=float, default=None, help='seconds for the spaCy call')
+    parser.add_argument('--converter-workers', type=int, default=4,
+                        help='maximum concurrent antiword processes for .doc files')
+    parser.add_argument('--converter-timeout', type=float, default=30,
+                        help='seconds before an antiword process is killed')
+    parser.add_argument('--cache', default=None,
+                        help='SQLite result cache shared by the workers')
+    parser.add_argument('--manifest', default=None,
+                        help='SQLite manifest; re-runs only parse new or modified resumes')
+    return parser
+
+
+def main(argv=None):
+    args = _build_arg_parser().parse_args(argv)
+    if not os.path.exists(args.resumes_dir):
+        raise FileNotFoundError(f"The '{args.resumes_dir}' folder was not found.")
+
+    limits = {name: getattr(args, name) for name in Budget.FIELDS}
+    budget = Budget(**limits) if any(value is not None for value in limits.values()) else None
+
+    model_name = models.DEFAULT_MODEL
+    if args.bundle:
+        # parse with the bundle's model and profile unless told otherwise
+        meta = bundle.read_meta(args.bundle)
+        model_name = meta['model']
+        if args.fields is None:
+            args.fields = meta['fields']
+
+    parser_options = dict(
+        skills_file=args.skills_file,
+        pdf_profile=args.pdf_profile,
+        budget=budget,
+        tiered=args.tiered,
+        chunk_chars=args.chunk_chars,
+        mode=args.mode,
+        fields=args.fields,
+    )
+    pool = create_pool(
+        processes=args.processes,
+        start_method=args.start_method,
+        preload=args.preload,
+        maxtasksperchild=args.maxtasksperchild or None,
+        model_name=model_name,
+        cache_path=args.cache,
+        bundle_path=args.bundle,
+        **parser_options,
+    )
+    manifest = None
+    previous = None
+    if args.manifest:
+        # the manifest is only committed once the new output is complete,
+        # so it always describes the last complete output
+        manifest = Manifest(args.manifest, _manifest_version(parser_options, model_name), commit_every=None)
+        previous = args.output + '.previous'
+        if os.path.exists(previous):
+            # left by an interrupted run: still the last complete output
+            pass
+        elif os.path.exists(args.output):
+            os.replace(args.output, previous)
+        else:
+            previous = None
+
+    writer = open_writer(args.output, args.format)
+    converter_pool = converters.ConverterPool(args.converter_workers, args.converter_timeout)
+    completed = False
+    try:
+        with pool:
+            progress = run_batch(
+                iter_resumes(args.resumes_dir),
+                writer,
+                pool,
+                max_in_flight=args.max_in_flight,
+                progress=Progress(args.progress_interval),
+                manifest=manifest,
+                converter_pool=converter_pool,
+                previous=previous,
+                task_timeout=args.task_timeout or None,
+            )
+        completed = True
+    finally:
+        writer.close()
+        converter_pool.shutdown(wait=False)
+        if manifest is not None:
+            manifest.close(commit=completed)
+            if completed and previous is not None:
+                os.remove(previous)
+
+    progress.report()
+    for reason, count in sorted(converter_pool.failures().items()):
+        print(f"{count} conversions failed: {reason}", file=sys.stderr)
+    print(f"Extraction complete. Results saved to '{args.output}'")
+
+
+if __name__ == '__main__':
+    main()
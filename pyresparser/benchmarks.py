@@ -0,0 +1,476 @@
+# Author: Resume Analyzer Benchmarks
+#
+# Small throughput/accuracy harnesses for choosing parser settings, e.g.
+#   python -m pyresparser.benchmarks pdf-profiles resumes/*.pdf
+# Without paths, sample_resume.txt is rendered into a PDF fixture.
+
+import argparse
+import io
+import os
+import re
+import time
+
+SAMPLE_RESUME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_resume.txt')
+
+
+def _pdf_escape(line):
+    line = line.encode('latin-1', 'replace')
+    return line.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def fixture_pdf(text, lines_per_page=50):
+    '''
+    Render plain text into a minimal Helvetica PDF, one line per text row,
+    so text fixtures such as sample_resume.txt can exercise the PDF path
+    '''
+    lines = text.splitlines() or ['']
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+    # 1: catalog, 2: page tree, 3: font, then a page and a content stream per page
+    bodies = {
+        1: b'<< /Type /Catalog /Pages 2 0 R >>',
+        3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    }
+    kids = []
+    number = 4
+    for page_lines in pages:
+        stream = b'BT /F1 10 Tf 12 TL 50 770 Td\n'
+        stream += b''.join(b'(' + _pdf_escape(line) + b') Tj T*\n' for line in page_lines)
+        stream += b'ET'
+        bodies[number] = (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (number + 1)
+        )
+        bodies[number + 1] = b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream)
+        kids.append(number)
+        number += 2
+    bodies[2] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % kid for kid in kids), len(kids)
+    )
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = {}
+    for obj in range(1, number):
+        offsets[obj] = out.tell()
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (obj, bodies[obj]))
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % number)
+    for obj in range(1, number):
+        out.write(b'%010d 00000 n \n' % offsets[obj])
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (number, xref))
+    return out.getvalue()
+
+
+def load_fixtures(paths=(), copies=1):
+    '''
+    Load benchmark fixtures as (name, pdf_bytes, source_text) tuples.
+    .txt files are rendered to PDF (repeated `copies` times, to mimic long
+    CVs) and keep their text as ground truth; PDFs have no ground truth.
+    '''
+    fixtures = []
+    for path in paths or (SAMPLE_RESUME,):
+        if path.lower().endswith('.txt'):
+            with open(path, encoding='utf-8') as fh:
+                text = '\n'.join([fh.read()] * copies)
+            fixtures.append((os.path.basename(path), fixture_pdf(text), text))
+        else:
+            with open(path, 'rb') as fh:
+                fixtures.append((os.path.basename(path), fh.read(), None))
+    return fixtures
+
+
+def _words(text):
+    return set(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+def _recall(expected, actual):
+    expected = _words(expected)
+    if not expected:
+        return 1.0
+    return len(expected & _words(actual)) / len(expected)
+
+
+def compare_pdf_profiles(fixtures, repeat=3):
+    '''
+    Time every PDF extraction profile over `fixtures` and measure how much
+    of the reference text it recovers: the fixture's source text when it has
+    one, otherwise the output of the 'layout' profile. Email and phone
+    agreement with the reference show whether contact extraction survives.
+    '''
+    from . import utils
+
+    extracted = {}
+    timings = {}
+    for profile in utils.PDF_PROFILES:
+        pages = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for name, data, _source in fixtures:
+                result = utils.extract_pdf(io.BytesIO(data), profile=profile)
+                extracted[profile, name] = result.text
+                pages += result.pages
+        timings[profile] = (time.perf_counter() - started, pages)
+
+    rows = []
+    for profile in utils.PDF_PROFILES:
+        seconds, pages = timings[profile]
+        recall, contact = [], []
+        for name, _data, source in fixtures:
+            reference = source if source is not None else extracted['layout', name]
+            text = extracted[profile, name]
+            recall.append(_recall(reference, text))
+            contact.append(
+                utils.extract_email(text) == utils.extract_email(reference)
+                and utils.extract_mobile_number(text) == utils.extract_mobile_number(reference)
+            )
+        rows.append({
+            'profile': profile,
+            'seconds': seconds,
+            'pages_per_second': pages / seconds if seconds else float('inf'),
+            'word_recall': sum(recall) / len(recall),
+            'contact_agreement': sum(contact) / len(contact),
+        })
+    return rows
+
+
+def _synthetic_skills(count):
+    # deterministic made-up skill phrases of one to three tokens
+    import random
+    rng = random.Random(count)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [
+        ' '.join(''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(rng.randint(1, 3)))
+        for _ in range(count)
+    ]
+
+
+def compare_skill_matchers(text, sizes=(100, 1000, 10000, 30000), repeat=20):
+    '''
+    Time the compiled SkillMatcher against the substring loop it replaced,
+    over taxonomies of growing size (constants.SKILLS padded with synthetic
+    skills). Matcher build time is reported separately; it is paid once.
+    '''
+    from . import constants as cs
+    from .skills import SkillMatcher
+
+    rows = []
+    text_lower = text.lower()
+    for size in sizes:
+        taxonomy = list(cs.SKILLS) + _synthetic_skills(max(size - len(cs.SKILLS), 0))
+
+        started = time.perf_counter()
+        matcher = SkillMatcher(taxonomy)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            matcher.find(text)
+        trie = (time.perf_counter() - started) / repeat
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            [skill for skill in taxonomy if skill in text_lower]
+        substring = (time.perf_counter() - started) / repeat
+
+        rows.append({
+            'skills': len(taxonomy),
+            'build_ms': build * 1000,
+            'trie_ms': trie * 1000,
+            'substring_ms': substring * 1000,
+        })
+    return rows
+
+
+# the patterns the scanner replaced, for comparison
+LEGACY_EMAIL = r"([^@|\s]+@[^@]+\.[^@|\s]+)"
+LEGACY_PHONE = r'[\+]?[1-9]?[0-9]{7,14}'
+LEGACY_DEGREES = [
+    r'bachelor', r'master', r'phd', r'doctorate', r'diploma', r'certificate',
+    r'b\.?tech', r'b\.?e', r'm\.?tech', r'm\.?e', r'b\.?sc', r'm\.?sc',
+    r'b\.?com', r'm\.?com', r'b\.?a', r'm\.?a', r'mba', r'bba'
+]
+
+# inputs that make backtracking patterns retry a long run from every offset
+ADVERSARIAL_INPUTS = {
+    'word_run': lambda size: 'a' * size,
+    'at_no_dot': lambda size: 'x@' + 'a' * size,
+    'dotted_run': lambda size: 'a.' * (size // 2),
+    'digit_groups': lambda size: '1 ' * (size // 2),
+}
+
+
+def _legacy_scan(text):
+    re.findall(LEGACY_EMAIL, text)
+    re.findall(LEGACY_PHONE, text)
+    lower = text.lower()
+    for pattern in LEGACY_DEGREES:
+        re.findall(pattern, lower)
+
+
+def compare_scanners(sizes=(1000, 2000, 4000, 8000), repeat=3):
+    '''
+    Time the single-pass field scanner against the legacy per-field regexes
+    on adversarial inputs of doubling size. A linear pattern roughly
+    doubles its time per row; the legacy email pattern quadruples.
+    '''
+    from . import scanner
+
+    rows = []
+    for name, make in ADVERSARIAL_INPUTS.items():
+        for size in sizes:
+            text = make(size)
+            timings = {}
+            for label, run in (('scanner', scanner.scan_fields), ('legacy', _legacy_scan)):
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    run(text)
+                timings[label] = (time.perf_counter() - started) / repeat
+            rows.append({
+                'input': name,
+                'chars': len(text),
+                'scanner_ms': timings['scanner'] * 1000,
+                'legacy_ms': timings['legacy'] * 1000,
+            })
+    return rows
+
+
+MODE_FIELDS = ('name', 'email', 'mobile_number', 'skills', 'degree', 'no_of_pages')
+
+
+def _agreement(expected, actual):
+    # lists are compared as sets (Jaccard), everything else exactly
+    if isinstance(expected, list) or isinstance(actual, list):
+        expected, actual = set(expected or ()), set(actual or ())
+        union = expected | actual
+        return len(expected & actual) / len(union) if union else 1.0
+    if isinstance(expected, str) and isinstance(actual, str):
+        return float(expected.lower() == actual.lower())
+    return float(expected == actual)
+
+
+def compare_modes(paths=(), repeat=3):
+    '''
+    Parse the fixture resumes (.pdf/.docx/.doc, or .txt given as text) in
+    full and lite mode. Returns the throughput of each mode, and how often
+    each lite field agrees with full mode, the reference.
+    '''
+    from .resume_parser import MODES, ResumeParser
+
+    fixtures = []
+    for path in paths or (SAMPLE_RESUME,):
+        text = None
+        if path.lower().endswith('.txt'):
+            with open(path, encoding='utf-8') as fh:
+                text = fh.read()
+        fixtures.append((path, text))
+
+    results = {}
+    timing_rows = []
+    for mode in MODES:
+        # the first full parse loads the model; keep that out of the timing
+        ResumeParser(fixtures[0][0], text=fixtures[0][1], cache=False, mode=mode)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            results[mode] = [
+                ResumeParser(path, text=text, cache=False, mode=mode).get_extracted_data()
+                for path, text in fixtures
+            ]
+        seconds = time.perf_counter() - started
+        timing_rows.append({
+            'mode': mode,
+            'seconds': seconds,
+            'docs_per_second': len(fixtures) * repeat / seconds if seconds else float('inf'),
+        })
+
+    agreement_rows = []
+    for field in MODE_FIELDS:
+        scores = [_agreement(full[field], lite[field]) for full, lite in zip(results['full'], results['lite'])]
+        agreement_rows.append({'field': field, 'lite_vs_full': sum(scores) / len(scores)})
+    return timing_rows, agreement_rows
+
+
+# run in a fresh interpreter: get a process ready to parse, print seconds
+_COLD_START_SCRIPT = '''
+import time
+started = time.perf_counter()
+from pyresparser import resume_parser
+{load}
+print(time.perf_counter() - started)
+'''
+
+_COLD_START_LOADS = {
+    'current': (
+        'from pyresparser import models, skills\n'
+        'models.get_model({model!r}, models.excluded_pipes({fields!r}))\n'
+        'skills.matcher_for({skills_file!r})'
+    ),
+    'bundle': 'from pyresparser import bundle\nbundle.load_bundle({bundle_path!r})',
+}
+
+
+def compare_cold_start(bundle_path=None, model=None, fields=None, skills_file=None, runs=5):
+    '''
+    Time how long a fresh Python process takes to become ready to parse:
+    loading the spaCy model and compiling the skills matcher as workers do
+    today, against loading a bundle (built in a temporary directory when
+    `bundle_path` is not given). Reports the median of `runs` processes,
+    both for the whole process and for the in-process load alone.
+    '''
+    import statistics
+    import subprocess
+    import sys
+    import tempfile
+    from . import bundle, models
+
+    model = model or models.DEFAULT_MODEL
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        if bundle_path is None:
+            bundle_path = os.path.join(tmp, 'bundle')
+            bundle.build_bundle(bundle_path, model, fields, skills_file)
+        else:
+            meta = bundle.read_meta(bundle_path)
+            model, fields, skills_file = meta['model'], meta['fields'], meta['skills_file']
+
+        rows = []
+        for path, load in _COLD_START_LOADS.items():
+            script = _COLD_START_SCRIPT.format(load=load.format(
+                model=model, fields=fields, skills_file=skills_file, bundle_path=bundle_path
+            ))
+            walls, loads = [], []
+            for _ in range(runs):
+                started = time.perf_counter()
+                proc = subprocess.run(
+                    [sys.executable, '-c', script], cwd=root, capture_output=True, text=True, check=True
+                )
+                walls.append(time.perf_counter() - started)
+                loads.append(float(proc.stdout.strip().splitlines()[-1]))
+            rows.append({
+                'path': path,
+                'process_seconds': statistics.median(walls),
+                'ready_seconds': statistics.median(loads),
+            })
+    return rows
+
+
+# Import budgets in seconds for a fresh interpreter; `import-time` fails
+# when a median goes over. Heavy modules must not load at import time.
+IMPORT_BUDGETS = {
+    'pyresparser': 0.05,
+    'pyresparser.resume_parser': 0.3,
+    'pyresparser.batch': 0.5,
+}
+HEAVY_MODULES = ('spacy', 'nltk', 'pandas', 'pdfminer', 'dateutil', 'pyarrow')
+
+_IMPORT_SCRIPT = '''
+import sys, time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+print(','.join(name for name in {heavy!r} if name in sys.modules))
+'''
+
+
+def measure_imports(budgets=None, runs=5):
+    '''
+    Time `import module` in fresh interpreters (median of `runs`) for each
+    module of `budgets`, and list the heavy modules each import pulled in
+    '''
+    import statistics
+    import subprocess
+    import sys
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    rows = []
+    for module, budget in (budgets or IMPORT_BUDGETS).items():
+        script = _IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+        timings = []
+        for _ in range(runs):
+            proc = subprocess.run(
+                [sys.executable, '-c', script], cwd=root, capture_output=True, text=True, check=True
+            )
+            seconds, heavy = proc.stdout.splitlines()[-2:]
+            timings.append(float(seconds))
+        median = statistics.median(timings)
+        rows.append({
+            'module': module,
+            'seconds': median,
+            'budget': float(budget),
+            'within_budget': median <= budget and not heavy,
+            'heavy_imports': heavy or '-',
+        })
+    return rows
+
+
+def _print_rows(rows):
+    if not rows:
+        return
+    columns = list(rows[0])
+    print('  '.join(f'{column:>18}' for column in columns))
+    for row in rows:
+        cells = []
+        for column in columns:
+            value = row[column]
+            cells.append(f'{value:>18.3f}' if isinstance(value, float) else f'{value!s:>18}')
+        print('  '.join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pyresparser benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    profiles = commands.add_parser('pdf-profiles', help='compare PDF extraction profiles')
+    profiles.add_argument('paths', nargs='*', help='.pdf or .txt fixtures (default: sample_resume.txt)')
+    profiles.add_argument('--repeat', type=int, default=3)
+    profiles.add_argument('--copies', type=int, default=1, help='repeat .txt fixtures to make long documents')
+
+    skills = commands.add_parser('skills', help='compare skill matching as the taxonomy grows')
+    skills.add_argument('path', nargs='?', default=SAMPLE_RESUME, help='text fixture')
+    skills.add_argument('--copies', type=int, default=1)
+
+    scan = commands.add_parser('scanner', help='compare field scanning on adversarial inputs')
+    scan.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000])
+    scan.add_argument('--repeat', type=int, default=3)
+
+    modes = commands.add_parser('modes', help='compare lite and full parsing speed and field agreement')
+    modes.add_argument('paths', nargs='*', help='resume fixtures, .txt read as text (default: sample_resume.txt)')
+    modes.add_argument('--repeat', type=int, default=3)
+
+    cold = commands.add_parser('cold-start', help='compare process start-up with and without a bundle')
+    cold.add_argument('--bundle', default=None, help='existing bundle (default: build one for --model)')
+    cold.add_argument('--model', default=None)
+    cold.add_argument('--fields', default=None)
+    cold.add_argument('--skills-file', default=None)
+    cold.add_argument('--runs', type=int, default=5)
+
+    imports = commands.add_parser('import-time', help='check import times against IMPORT_BUDGETS')
+    imports.add_argument('--runs', type=int, default=5)
+
+    args = parser.parse_args(argv)
+    if args.command == 'pdf-profiles':
+        _print_rows(compare_pdf_profiles(load_fixtures(args.paths, args.copies), args.repeat))
+    elif args.command == 'skills':
+        with open(args.path, encoding='utf-8') as fh:
+            text = '\n'.join([fh.read()] * args.copies)
+        _print_rows(compare_skill_matchers(text))
+    elif args.command == 'scanner':
+        _print_rows(compare_scanners(args.sizes, args.repeat))
+    elif args.command == 'modes':
+        timing_rows, agreement_rows = compare_modes(args.paths, args.repeat)
+        _print_rows(timing_rows)
+        print()
+        _print_rows(agreement_rows)
+    elif args.command == 'cold-start':
+        from .models import parse_fields
+        fields = parse_fields(args.fields) if args.fields is not None else None
+        _print_rows(compare_cold_start(args.bundle, args.model, fields, args.skills_file, args.runs))
+    elif args.command == 'import-time':
+        rows = measure_imports(runs=args.runs)
+        _print_rows(rows)
+        if not all(row['within_budget'] for row in rows):
+            parser.exit(1, 'import budget exceeded\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# Author: Resume Analyzer Resource Budgets
+
+import signal
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+_violations = Counter()
+_violations_lock = threading.Lock()
+
+
+class BudgetExceeded(RuntimeError):
+    '''
+    Raised when a document exceeds a hard limit of its Budget.
+    `kind` names the limit, e.g. 'max_bytes' or 'nlp_timeout'.
+    '''
+
+    def __init__(self, kind, limit, actual=None):
+        self.kind = kind
+        self.limit = limit
+        self.actual = actual
+        detail = f" (got {actual})" if actual is not None else ''
+        super().__init__(f"Resume exceeds budget {kind}={limit}{detail}")
+
+
+class Budget:
+    '''
+    Per-document resource limits; None disables a limit.
+
+    max_bytes        - refuse files larger than this (hard limit)
+    max_pages        - only extract the first pages of a PDF (partial result)
+    max_chars        - truncate the text sent to spaCy (partial result)
+    extract_timeout  - seconds for text extraction; pages read so far are kept
+    nlp_timeout      - seconds for the spaCy call (hard limit)
+
+    Timeouts interrupt the running stage with SIGALRM when called from the
+    main thread of a process (the case in batch pool workers). Elsewhere,
+    e.g. in Streamlit script threads, they are checked between PDF pages.
+    '''
+
+    FIELDS = ('max_bytes', 'max_pages', 'max_chars', 'extract_timeout', 'nlp_timeout')
+
+    def __init__(self, max_bytes=None, max_pages=None, max_chars=None, extract_timeout=None, nlp_timeout=None):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.extract_timeout = extract_timeout
+        self.nlp_timeout = nlp_timeout
+
+    def __repr__(self):
+        # stable, so it can be part of a result-cache key
+        limits = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.FIELDS)
+        return f'Budget({limits})'
+
+
+def record_violation(kind):
+    with _violations_lock:
+        _violations[kind] += 1
+
+
+def violation_counts():
+    '''
+    Return how many times each budget limit was exceeded in this process
+    '''
+    with _violations_lock:
+        return dict(_violations)
+
+
+def reset_violation_counts():
+    with _violations_lock:
+        _violations.clear()
+
+
+class Deadline:
+    def __init__(self, seconds, kind):
+        self.seconds = seconds
+        self.kind = kind
+        self._expires = time.monotonic() + seconds if seconds else None
+
+    def check(self):
+        '''
+        Raise BudgetExceeded if the deadline has passed
+        '''
+        if self._expires is not None and time.monotonic() > self._expires:
+            raise BudgetExceeded(self.kind, self.seconds)
+
+    def remaining(self):
+        # seconds left, or None without a limit
+        if self._expires is None:
+            return None
+        return max(0.0, self._expires - time.monotonic())
+
+
+def _can_use_alarm():
+    return (
+        hasattr(signal, 'setitimer')
+        and threading.current_thread() is threading.main_thread()
+        # never clobber a timer somebody else has armed
+        and signal.getitimer(signal.ITIMER_REAL)[0] == 0
+    )
+
+
+@contextmanager
+def deadline(seconds, kind):
+    '''
+    Bound the wall-clock time of the enclosed stage to `seconds`, raising
+    BudgetExceeded(kind) when it runs over. Yields a Deadline whose check()
+    can be called at safe points for threads where SIGALRM is unavailable.
+    '''
+    current = Deadline(seconds, kind)
+    if not seconds or not _can_use_alarm():
+        yield current
+        return
+
+    def on_alarm(signum, frame):
+        raise BudgetExceeded(kind, seconds)
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield current
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
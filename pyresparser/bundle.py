@@ -0,0 +1,154 @@
+# Author: Resume Analyzer Pipeline Bundles
+#
+# A bundle is a directory with everything a parser process otherwise
+# builds at start-up, ready to load in one step:
+#   pipeline/      the spaCy pipeline, reduced to a field profile; with
+#                  --skill-ruler, plus a disabled 'skill_ruler' EntityRuler
+#                  over the taxonomy
+#   skills.pickle  the compiled SkillMatcher
+#   bundle.json    what the bundle was built from; written last
+# Build one with
+#   python -m pyresparser.bundle build bundles/details --fields details
+
+import argparse
+import json
+import os
+import pickle
+import time
+
+from . import __version__
+from . import models
+from . import skills
+from .cache import taxonomy_version
+
+BUNDLE_FORMAT = 1
+SKILL_RULER = 'skill_ruler'
+
+_PIPELINE_DIR = 'pipeline'
+_SKILLS_FILE = 'skills.pickle'
+_META_FILE = 'bundle.json'
+
+
+def build_bundle(path, model=models.DEFAULT_MODEL, fields=None, skills_file=None, skill_ruler=False):
+    '''
+    Write a bundle for `model`, loaded with only the components `fields`
+    need (see models.PROFILES), and the skills taxonomy `skills_file`
+    (default: constants.SKILLS). With `skill_ruler`, the pipeline gets an
+    EntityRuler labelling taxonomy phrases SKILL, disabled so that it never
+    runs unless enabled. No extractor uses it yet, and spaCy rebuilds its
+    patterns on every load (seconds for a large taxonomy), so it is off by
+    default. Returns the bundle's metadata.
+    '''
+    import spacy
+
+    exclude = models.excluded_pipes(fields)
+    nlp = spacy.load(model, exclude=list(exclude))
+    matcher = skills.matcher_for(skills_file)
+
+    if skill_ruler:
+        ruler = nlp.add_pipe(
+            'entity_ruler', name=SKILL_RULER, last=True,
+            config={'phrase_matcher_attr': 'LOWER', 'overwrite_ents': False},
+        )
+        ruler.add_patterns([
+            {'label': 'SKILL', 'pattern': phrase, 'id': skill}
+            for phrase, skill in matcher.phrases()
+        ])
+        nlp.disable_pipe(SKILL_RULER)
+
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, _META_FILE)
+    if os.path.exists(meta_path):
+        # an interrupted rebuild must not leave a valid-looking bundle
+        os.remove(meta_path)
+
+    nlp.to_disk(os.path.join(path, _PIPELINE_DIR))
+    with open(os.path.join(path, _SKILLS_FILE), 'wb') as fh:
+        pickle.dump(matcher, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    meta = {
+        'format': BUNDLE_FORMAT,
+        'version': __version__,
+        'spacy_version': spacy.__version__,
+        'model': model,
+        'fields': fields,
+        'exclude': list(exclude),
+        'pipes': list(nlp.pipe_names),
+        'skill_ruler': skill_ruler,
+        'skills_file': os.path.abspath(skills_file) if skills_file else None,
+        'skills_source': list(skills.taxonomy_key(skills_file)) if skills_file else None,
+        'taxonomy': taxonomy_version(skills_file),
+        'skills': matcher.size,
+        'created': time.time(),
+    }
+    with open(meta_path, 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh, indent=2)
+    return meta
+
+
+def read_meta(path):
+    '''
+    Return a bundle's metadata, raising ValueError for anything that is not
+    a complete bundle of this format
+    '''
+    try:
+        with open(os.path.join(path, _META_FILE), encoding='utf-8') as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Not a pyresparser bundle: {path} ({e})")
+    if meta.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Bundle format {meta.get('format')} is not supported, rebuild {path}")
+    return meta
+
+
+def load_bundle(path):
+    '''
+    Load a bundle into this process: its pipeline becomes what
+    models.get_model(model, exclude) returns for the bundle's model and
+    field profile, and its skills matcher what skills.matcher_for()
+    returns, unless the taxonomy changed since the bundle was built.
+    Returns the bundle's metadata.
+    '''
+    meta = read_meta(path)
+    exclude = tuple(meta['exclude'])
+
+    if not models.is_loaded(meta['model'], exclude):
+        import spacy
+        started = time.perf_counter()
+        nlp = spacy.load(os.path.join(path, _PIPELINE_DIR))
+        models.register(nlp, meta['model'], exclude, time.perf_counter() - started)
+
+    skills_file = meta['skills_file']
+    try:
+        current = taxonomy_version(skills_file)
+    except OSError:
+        current = None
+    if current == meta['taxonomy']:
+        with open(os.path.join(path, _SKILLS_FILE), 'rb') as fh:
+            matcher = pickle.load(fh)
+        skills.install_matcher(matcher, skills_file, meta['skills_source'])
+    return meta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build a pyresparser pipeline bundle.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='serialize a ready-to-load bundle')
+    build.add_argument('path')
+    build.add_argument('--model', default=models.DEFAULT_MODEL)
+    build.add_argument('--fields', default=None,
+                       help=f'profile ({", ".join(models.PROFILES)}) or comma-separated fields')
+    build.add_argument('--skills-file', default=None)
+    build.add_argument('--skill-ruler', action='store_true',
+                       help="add a disabled 'skill_ruler' EntityRuler; slows loading for large taxonomies")
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        fields = models.parse_fields(args.fields) if args.fields is not None else None
+        meta = build_bundle(args.path, args.model, fields, args.skills_file, args.skill_ruler)
+        print(json.dumps(meta, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+# Author: Resume Analyzer Result Cache
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from . import __version__
+from . import constants as cs
+
+_CHUNK_SIZE = 1 << 20
+
+# a full disk tier is evicted down to this share of max_bytes, so that
+# eviction runs once per many inserts instead of on every one
+_LOW_WATER = 0.8
+
+
+def resume_digest(resume):
+    '''
+    Helper function to compute the SHA-256 of a resume's bytes, for a path
+    or an in-memory upload. BytesIO buffers are hashed in place, not copied.
+    '''
+    digest = hashlib.sha256()
+    if isinstance(resume, io.BytesIO):
+        with resume.getbuffer() as view:
+            digest.update(view)
+    elif hasattr(resume, 'read'):
+        position = resume.tell()
+        for chunk in iter(lambda: resume.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+        resume.seek(position)
+    else:
+        with open(resume, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def taxonomy_version(skills_file=None):
+    '''
+    Helper function to fingerprint the skills taxonomy a result depends on
+    '''
+    digest = hashlib.sha256('\n'.join(cs.SKILLS).encode('utf-8'))
+    if skills_file:
+        st = os.stat(skills_file)
+        digest.update(f'{os.path.abspath(skills_file)}:{st.st_size}:{st.st_mtime_ns}'.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def cache_key(digest, skills_file=None, **options):
+    '''
+    Build the cache key for a resume digest: the parser version, the skills
+    taxonomy and any other option that changes the parse result
+    '''
+    parts = [digest, __version__, taxonomy_version(skills_file)]
+    parts.extend(f'{name}={options[name]!r}' for name in sorted(options))
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def parser_version(skills_file=None, **options):
+    '''
+    Helper function to fingerprint the parser version together with the
+    options and taxonomy cache_key() takes, e.g. for a batch Manifest:
+    results parsed with other options do not count as up to date
+    '''
+    return f'{__version__}+{cache_key("", skills_file, **options)[:16]}'
+
+
+class ResultCache:
+    '''
+    Two-tier cache of parse results: an in-memory LRU of `max_items`
+    entries in front of an optional SQLite file capped at `max_bytes`,
+    evicting least recently used rows down to 80% of the cap once it is
+    exceeded. Safe to share between threads.
+    '''
+
+    def __init__(self, path=None, max_items=256, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        self._conn = None
+        self._disk_bytes = 0
+        if path is not None:
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    size INTEGER,
+                    accessed REAL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+            self._conn.commit()
+            self._disk_bytes = self._stored_bytes()
+
+    def key_for(self, resume, **options):
+        return cache_key(resume_digest(resume), **options)
+
+    def get(self, key):
+        '''
+        Return a fresh copy of the cached result for `key`, or None
+        '''
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return json.loads(value)
+
+            if self._conn is not None:
+                row = self._conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+                    self._conn.commit()
+                    self._remember(key, row[0])
+                    self._counters['disk_hits'] += 1
+                    return json.loads(row[0])
+
+            self._counters['misses'] += 1
+            return None
+
+    def put(self, key, result):
+        value = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, value)
+            if self._conn is not None:
+                size = len(value.encode('utf-8'))
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                    (key, value, size, time.time())
+                )
+                self._conn.commit()
+                self._disk_bytes += size
+                if self._disk_bytes > self.max_bytes:
+                    self._evict()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _stored_bytes(self):
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def _evict(self):
+        # other processes may share the file, so re-read the real total first
+        self._disk_bytes = self._stored_bytes()
+        target = self.max_bytes * _LOW_WATER
+        # walks the accessed index lazily: only the evicted rows are read
+        doomed = 0
+        for (size,) in self._conn.execute('SELECT size FROM results ORDER BY accessed'):
+            if self._disk_bytes <= target:
+                break
+            doomed += 1
+            self._disk_bytes -= size
+        self._conn.execute(
+            'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed LIMIT ?)',
+            (doomed,)
+        )
+        self._conn.commit()
+        self._counters['evictions'] += doomed
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+            stats['hit_rate'] = (lookups - stats['misses']) / lookups if lookups else 0.0
+            stats['memory_items'] = len(self._memory)
+            stats['disk_bytes'] = self._disk_bytes if self._conn is not None else None
+            return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM results')
+                self._conn.commit()
+                self._disk_bytes = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    '''
+    Return the process-wide cache, memory-only unless configure() was called
+    '''
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
+
+
+def configure(path=None, max_items=256, max_bytes=64 * 1024 * 1024):
+    '''
+    Replace the process-wide cache, e.g. to add an SQLite tier at `path`.
+    Calling it again with the same path keeps the existing cache.
+    '''
+    global _default_cache
+    with _default_lock:
+        if _default_cache is not None:
+            if _default_cache.path == path and path is not None:
+                return _default_cache
+            _default_cache.close()
+        _default_cache = ResultCache(path, max_items=max_items, max_bytes=max_bytes)
+        return _default_cache
+
+
+def stats():
+    return default_cache().stats()
@@ -173,3 +173,40 @@ SKILL_CATEGORIES = {
         'critical thinking', 'time management', 'creativity', 'adaptability'
     ]
 }
+
+# Resume section headings, by the section they start (matched case-insensitively)
+RESUME_SECTIONS = {
+    'summary': [
+        'summary', 'professional summary', 'career summary', 'profile', 'objective',
+        'career objective', 'about me'
+    ],
+    'contact': [
+        'contact', 'contact information', 'contact details', 'personal details',
+        'personal information'
+    ],
+    'education': [
+        'education', 'academic background', 'academic qualifications',
+        'educational qualifications', 'qualifications', 'academics'
+    ],
+    'coursework': ['coursework', 'relevant coursework'],
+    'experience': [
+        'experience', 'work experience', 'professional experience', 'employment',
+        'employment history', 'work history', 'internships', 'internship'
+    ],
+    'skills': [
+        'skills', 'technical skills', 'key skills', 'core competencies',
+        'competencies', 'skills summary'
+    ],
+    'projects': ['projects', 'personal projects', 'academic projects', 'key projects'],
+    'certifications': [
+        'certifications', 'certification', 'certificates', 'licenses and certifications',
+        'licenses & certifications'
+    ],
+    'awards': [
+        'awards', 'achievements', 'accomplishments', 'honors', 'honors and awards',
+        'awards and recognition'
+    ],
+    'publications': ['publications'],
+    'languages': ['languages'],
+    'interests': ['interests', 'hobbies', 'hobbies and interests'],
+}
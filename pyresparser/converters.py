@@ -0,0 +1,89 @@
+# Author: Resume Analyzer External Converters
+
+import subprocess
+import threading
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Command line of the external converter for each extension; the file path
+# is appended as the last argument and the text is read from stdout
+CONVERTERS = {
+    '.doc': ['antiword'],
+}
+
+# Outcome of one conversion: `error` is None on success
+ConversionResult = namedtuple('ConversionResult', ['text', 'error'])
+
+
+class ConverterPool:
+    '''
+    Bounded, concurrent runner for external text converters such as
+    antiword. At most `max_workers` converters run at once, each call is
+    killed after `timeout` seconds, and failure reasons are counted.
+    '''
+
+    def __init__(self, max_workers=4, timeout=30):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='converter')
+        self._failures = Counter()
+        self._lock = threading.Lock()
+
+    def submit(self, path, extension='.doc'):
+        '''
+        Start converting `path` and return a Future of its ConversionResult
+        '''
+        return self._executor.submit(self._run, CONVERTERS[extension], path)
+
+    def convert(self, path, extension='.doc'):
+        return self.submit(path, extension).result()
+
+    def _run(self, command, path):
+        try:
+            proc = subprocess.run(
+                command + [path],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=self.timeout,
+            )
+        except FileNotFoundError:
+            return self._failed(f'{command[0]} not installed')
+        except subprocess.TimeoutExpired:
+            return self._failed(f'timed out after {self.timeout}s')
+        except OSError as e:
+            return self._failed(f'{command[0]} failed to start: {e}')
+
+        if proc.returncode != 0:
+            stderr = proc.stderr.decode('utf-8', 'replace').strip().splitlines()
+            reason = f'{command[0]} exited with {proc.returncode}'
+            return self._failed(f'{reason}: {stderr[0]}' if stderr else reason)
+        return ConversionResult(proc.stdout.decode('utf-8', 'replace'), None)
+
+    def _failed(self, reason):
+        with self._lock:
+            self._failures[reason] += 1
+        return ConversionResult('', reason)
+
+    def failures(self):
+        '''
+        Return how many conversions failed, by reason
+        '''
+        with self._lock:
+            return dict(self._failures)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def default_pool():
+    '''
+    Return the process-wide converter pool, created on first use
+    '''
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ConverterPool()
+        return _default_pool
@@ -0,0 +1,148 @@
+# Author: Resume Analyzer Document
+
+from collections import namedtuple
+from functools import cached_property
+
+from . import scanner
+from . import sections as resume_sections
+from . import skills
+
+# resumes open with the name and contact details, within about this many characters
+HEADER_CHARS = 500
+
+# chunks that spaCy holds at once when a long text is processed in pieces
+CHUNK_BATCH = 4
+
+# Plain named entity; mirrors the spaCy Span attributes the extractors read
+Entity = namedtuple('Entity', ['text', 'label_', 'start_char', 'end_char'])
+
+
+class ResumeDocument:
+    '''
+    One resume's text and every view the extractors derive from it. Each
+    view is computed on first use and then shared, so no extractor repeats
+    a full-text copy (lowercasing, tokenizing, running spaCy) done by
+    another.
+
+    `nlp` is the spaCy pipeline used to build `doc` on demand, over the
+    normalized text capped at `max_chars`; set_doc() attaches a doc that
+    was produced elsewhere, e.g. by nlp.pipe. Texts longer than
+    `chunk_chars` (or the pipeline's max_length) get their entities from
+    chunks cut at section and paragraph breaks instead, so spaCy's memory
+    stays bounded however long the resume is.
+    '''
+
+    def __init__(self, raw_text, nlp=None, max_chars=None, chunk_chars=None):
+        self.raw_text = raw_text
+        self.max_chars = max_chars
+        self.chunk_chars = chunk_chars
+        self._nlp = nlp
+        self._sections_text = {}
+
+    def set_doc(self, doc):
+        self.__dict__['doc'] = doc
+
+    @cached_property
+    def text(self):
+        # whitespace collapsed to single spaces
+        return ' '.join(self.raw_text.split())
+
+    @cached_property
+    def lower_text(self):
+        return self.text.lower()
+
+    @property
+    def truncated(self):
+        return self.max_chars is not None and len(self.text) > self.max_chars
+
+    @cached_property
+    def nlp_text(self):
+        return self.text[:self.max_chars] if self.truncated else self.text
+
+    @property
+    def chunked(self):
+        limit = self.chunk_chars or getattr(self._nlp, 'max_length', None)
+        return limit is not None and len(self.nlp_text) > limit
+
+    def _nlp_chunks(self):
+        # (chunk text, offset into nlp_text) pairs. Chunks are cut from the
+        # raw text, where section and paragraph breaks are still visible,
+        # and normalized one by one; normalizing never lengthens a chunk.
+        limit = len(self.nlp_text)
+        chunk_chars = self.chunk_chars or self._nlp.max_length
+        offset = 0
+        space = False
+        for raw in resume_sections.split_chunks(self.raw_text, chunk_chars, self.sections):
+            text = ' '.join(raw.split())
+            if text:
+                # the normalized text has a space here if either side had whitespace
+                if offset and (space or raw[0].isspace()):
+                    offset += 1
+                if offset >= limit:
+                    return
+                yield text[:limit - offset], offset
+                offset += len(text)
+            space = raw[-1].isspace()
+
+    @cached_property
+    def skill_tokens(self):
+        return skills.tokenize(self.lower_text, lowered=True)
+
+    @cached_property
+    def token_set(self):
+        return frozenset(self.skill_tokens)
+
+    @cached_property
+    def sections(self):
+        # spans over raw_text, whose line breaks mark the headings
+        return resume_sections.segment(self.raw_text)
+
+    def section_text(self, name):
+        '''
+        Return the text of section `name`, or None when there is none
+        '''
+        if name not in self._sections_text:
+            self._sections_text[name] = self.sections.get(name)
+        return self._sections_text[name]
+
+    @cached_property
+    def header(self):
+        '''
+        ResumeDocument over the first HEADER_CHARS of the text, cut at a line
+        break or space, sharing this document's pipeline; the document
+        itself when it is no longer than that
+        '''
+        raw = self.raw_text.lstrip()
+        if len(raw) <= HEADER_CHARS:
+            return self
+        cut = raw.rfind('\n', 0, HEADER_CHARS)
+        if cut < HEADER_CHARS // 2:
+            cut = raw.rfind(' ', 0, HEADER_CHARS)
+        return ResumeDocument(raw[:cut if cut > 0 else HEADER_CHARS], nlp=self._nlp)
+
+    @cached_property
+    def fields(self):
+        # emails, urls, phones and degrees, from one scanner pass
+        return scanner.scan_fields(self.text)
+
+    @cached_property
+    def doc(self):
+        if self._nlp is None:
+            raise RuntimeError("No spaCy pipeline available for this document.")
+        return self._nlp(self.nlp_text)
+
+    @cached_property
+    def noun_chunks(self):
+        return list(self.doc.noun_chunks)
+
+    @cached_property
+    def ents(self):
+        if not self.chunked:
+            return [Entity(ent.text, ent.label_, ent.start_char, ent.end_char) for ent in self.doc.ents]
+        # offsets are shifted back onto nlp_text, as if it had been one doc
+        docs = self._nlp.pipe(self._nlp_chunks(), as_tuples=True, batch_size=CHUNK_BATCH)
+        return [
+            Entity(ent.text, ent.label_, offset + ent.start_char, offset + ent.end_char)
+            for doc, offset in docs
+            for ent in doc.ents
+        ]
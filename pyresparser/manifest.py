@@ -0,0 +1,117 @@
+# Author: Resume Analyzer Batch Manifest
+
+import hashlib
+import os
+import sqlite3
+import time
+
+from . import __version__
+
+_CHUNK_SIZE = 1 << 20
+
+
+def file_sha256(path):
+    '''
+    Helper function to hash a file's content without reading it all at once
+    '''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    '''
+    SQLite record of every resume a batch run has parsed: its size, mtime,
+    content hash, the parser version used and where its result was written.
+    A re-run consults it to skip files that have not changed.
+    With commit_every=None changes are only committed by close(), so a
+    failed run can be discarded with close(commit=False).
+    '''
+
+    def __init__(self, path, parser_version=__version__, commit_every=100):
+        self.path = path
+        self.parser_version = parser_version
+        self.commit_every = commit_every
+        self._pending = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                sha256 TEXT,
+                parser_version TEXT,
+                output TEXT,
+                position INTEGER,
+                parsed_at REAL
+            )
+        ''')
+        self._conn.commit()
+
+    def lookup(self, file_path):
+        row = self._conn.execute(
+            'SELECT size, mtime_ns, sha256, parser_version, output, position FROM files WHERE path = ?',
+            (file_path,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('size', 'mtime_ns', 'sha256', 'parser_version', 'output', 'position')
+        return dict(zip(keys, row))
+
+    def fingerprint(self, file_path):
+        '''
+        Return (needs_parsing, fingerprint) for `file_path`. Unchanged size and
+        mtime skip hashing entirely; otherwise the content hash decides.
+        '''
+        st = os.stat(file_path)
+        entry = self.lookup(file_path)
+        if entry is None or entry['parser_version'] != self.parser_version:
+            return True, (st.st_size, st.st_mtime_ns, file_sha256(file_path))
+
+        if entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return False, (st.st_size, st.st_mtime_ns, entry['sha256'])
+
+        sha256 = file_sha256(file_path)
+        if sha256 == entry['sha256']:
+            # touched but not modified: remember the new mtime, keep the result
+            self._conn.execute(
+                'UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?',
+                (st.st_size, st.st_mtime_ns, file_path)
+            )
+            self._mark_dirty()
+            return False, (st.st_size, st.st_mtime_ns, sha256)
+        return True, (st.st_size, st.st_mtime_ns, sha256)
+
+    def record(self, file_path, fingerprint, output, position):
+        size, mtime_ns, sha256 = fingerprint
+        self._conn.execute(
+            'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (file_path, size, mtime_ns, sha256, self.parser_version, output, position, time.time())
+        )
+        self._mark_dirty()
+
+    def forget(self, file_path):
+        # its last result is no longer in the output
+        self._conn.execute('DELETE FROM files WHERE path = ?', (file_path,))
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._pending += 1
+        if self.commit_every is not None and self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self, commit=True):
+        if commit:
+            self._conn.commit()
+        else:
+            self._conn.rollback()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(commit=exc_type is None)
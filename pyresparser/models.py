@@ -0,0 +1,203 @@
+# Author: Resume Analyzer Model Registry
+
+import os
+import threading
+import time
+
+DEFAULT_MODEL = 'en_core_web_sm'
+
+# Components of the en_core_web_* pipelines, in pipeline order
+PIPES = ('tok2vec', 'tagger', 'parser', 'senter', 'attribute_ruler', 'lemmatizer', 'ner')
+
+# Components each output field reads. NER in these pipelines embeds its
+# own tok2vec, so it runs without the shared one; the other fields are
+# rule-based and need only the tokenizer.
+FIELD_PIPES = {
+    'name': ('ner',),
+    'email': (),
+    'mobile_number': (),
+    'skills': (),
+    'degree': (),
+    'no_of_pages': (),
+    'noun_chunks': ('tok2vec', 'tagger', 'attribute_ruler', 'parser'),
+}
+
+# Named field sets; None loads every component
+PROFILES = {
+    'full': None,
+    'details': ('name', 'email', 'mobile_number', 'skills', 'degree', 'no_of_pages'),
+    'contact': ('name', 'email', 'mobile_number'),
+    'rules': ('email', 'mobile_number', 'skills', 'degree', 'no_of_pages'),
+}
+
+# registry key -> {'model': name, 'exclude': tuple, 'nlp': Language,
+#                  'load_seconds': float, 'rss_bytes': int|None}
+_registry = {}
+_registry_lock = threading.Lock()
+# one lock per model name so loading one pipeline never blocks another
+_load_locks = {}
+
+
+def _current_rss():
+    '''
+    Helper function to read the resident set size of this process in bytes.
+    Returns None when it cannot be determined on this platform.
+    '''
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _load_lock(key):
+    with _registry_lock:
+        return _load_locks.setdefault(key, threading.Lock())
+
+
+def pipes_for(fields):
+    '''
+    Return the set of components that `fields` (a list of field names or
+    a PROFILES name) need, or None when every component is wanted
+    '''
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        if fields not in PROFILES:
+            raise ValueError(f"Unknown profile {fields!r}, expected one of {tuple(PROFILES)}")
+        fields = PROFILES[fields]
+        if fields is None:
+            return None
+    unknown = [field for field in fields if field not in FIELD_PIPES]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}, expected some of {tuple(FIELD_PIPES)}")
+    return {pipe for field in fields for pipe in FIELD_PIPES[field]}
+
+
+def parse_fields(value):
+    '''
+    Parse a command-line fields value: a profile name, or comma-separated
+    field names. Raises ValueError for unknown names.
+    '''
+    fields = value if value in PROFILES else [field.strip() for field in value.split(',') if field.strip()]
+    pipes_for(fields)
+    return fields
+
+
+def excluded_pipes(fields):
+    '''
+    Return the components to leave out of the pipeline for `fields`
+    '''
+    needed = pipes_for(fields)
+    if needed is None:
+        return ()
+    return tuple(pipe for pipe in PIPES if pipe not in needed)
+
+
+def registry_key(name=DEFAULT_MODEL, exclude=()):
+    # pipelines loaded with different exclusions are different objects
+    if not exclude:
+        return name
+    return f"{name}[exclude={','.join(sorted(exclude))}]"
+
+
+def get_model(name=DEFAULT_MODEL, exclude=()):
+    '''
+    Return the spaCy pipeline `name` without the `exclude` components,
+    loading it on first use. Excluded components are never loaded, so
+    they cost neither memory nor time. The pipeline is loaded once per
+    process and shared by every caller; concurrent first callers wait for
+    a single load instead of racing.
+    '''
+    key = registry_key(name, exclude)
+    entry = _registry.get(key)
+    if entry is not None:
+        return entry['nlp']
+
+    with _load_lock(key):
+        entry = _registry.get(key)
+        if entry is not None:
+            return entry['nlp']
+
+        import spacy
+        rss_before = _current_rss()
+        started = time.perf_counter()
+        try:
+            nlp = spacy.load(name, exclude=list(exclude))
+        except Exception as e:
+            raise RuntimeError(f"Failed to load SpaCy model: {e}")
+        load_seconds = time.perf_counter() - started
+        rss_after = _current_rss()
+
+        rss_bytes = None
+        if rss_before is not None and rss_after is not None:
+            rss_bytes = max(rss_after - rss_before, 0)
+
+        return register(nlp, name, exclude, load_seconds, rss_bytes)
+
+
+def register(nlp, name=DEFAULT_MODEL, exclude=(), load_seconds=0.0, rss_bytes=None):
+    '''
+    Install an already loaded pipeline, e.g. one from a bundle, as the one
+    get_model(name, exclude) returns
+    '''
+    with _registry_lock:
+        _registry[registry_key(name, exclude)] = {
+            'model': name,
+            'exclude': tuple(sorted(exclude)),
+            'nlp': nlp,
+            'load_seconds': load_seconds,
+            'rss_bytes': rss_bytes,
+        }
+    return nlp
+
+
+def warm_up(names=(DEFAULT_MODEL,), exclude=()):
+    '''
+    Load every pipeline in `names` ahead of the first parse, e.g. at
+    application or worker start-up. Returns the loaded model info.
+    '''
+    if isinstance(names, str):
+        names = (names,)
+    for name in names:
+        get_model(name, exclude)
+    return loaded_models()
+
+
+def loaded_models():
+    '''
+    Describe the pipelines loaded in this process: their components,
+    load time and the resident memory growth observed while loading.
+    '''
+    with _registry_lock:
+        entries = list(_registry.items())
+    return {
+        name: {
+            'pipes': list(entry['nlp'].pipe_names),
+            'load_seconds': round(entry['load_seconds'], 4),
+            'rss_bytes': entry['rss_bytes'],
+        }
+        for name, entry in entries
+    }
+
+
+def is_loaded(name=DEFAULT_MODEL, exclude=()):
+    return registry_key(name, exclude) in _registry
+
+
+def clear(name=None):
+    '''
+    Drop one pipeline, with all its component profiles, (or all of them)
+    from the registry so the next get_model() call reloads it.
+    '''
+    with _registry_lock:
+        if name is None:
+            _registry.clear()
+        else:
+            for key in [key for key, entry in _registry.items() if entry.get('model', key) == name]:
+                del _registry[key]
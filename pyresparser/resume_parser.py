@@ -1,23 +1,251 @@
 import os
 import io
-import spacy
-import json
-import multiprocessing as mp
-from spacy.matcher import Matcher
+from . import models
 from . import utils  # Make sure your `utils.py` is in the same directory
+from .budget import BudgetExceeded, deadline, record_violation
+from .cache import default_cache
+from .document import ResumeDocument
+
+
+def _resume_extension(resume):
+    # Determine file extension
+    try:
+        if hasattr(resume, 'read'):
+            # uploads and open files carry their original file name
+            ext = resume.name.split('.')[-1]
+        else:
+            ext = os.path.splitext(resume)[1].split('.')[-1]
+    except Exception:
+        ext = 'pdf'  # fallback to PDF
+    # 'CV.PDF' is a PDF too
+    return '.' + ext.lower()
+
+
+def _resume_size(resume):
+    if isinstance(resume, io.BytesIO):
+        return resume.getbuffer().nbytes
+    if hasattr(resume, 'seek'):
+        position = resume.tell()
+        size = resume.seek(0, io.SEEK_END)
+        resume.seek(position)
+        return size
+    return os.path.getsize(resume)
+
+
+def _read_resume(resume, parallel_pages=False, pdf_profile=utils.DEFAULT_PDF_PROFILE, budget=None, text=None):
+    '''
+    Extract the raw text and page count of a resume, raising ValueError when
+    the text is empty. PDFs are read in a single pass for both.
+    Also returns the soft budget limits that truncated the text; hard limits
+    raise BudgetExceeded. Pre-extracted `text` skips extraction.
+    '''
+    if budget is not None and budget.max_bytes is not None:
+        # also for pre-extracted text, e.g. .doc files converted by the batch CLI
+        size = _resume_size(resume)
+        if size > budget.max_bytes:
+            record_violation('max_bytes')
+            raise BudgetExceeded('max_bytes', budget.max_bytes, size)
+
+    if text is not None:
+        if not text.strip():
+            raise ValueError("Could not extract text from resume.")
+        return text, None, []
+
+    violations = []
+    max_pages = extract_timeout = None
+    if budget is not None:
+        max_pages, extract_timeout = budget.max_pages, budget.extract_timeout
+
+    ext = _resume_extension(resume)
+    try:
+        with deadline(extract_timeout, 'extract_timeout') as extract_deadline:
+            if ext == '.pdf':
+                extraction = utils.extract_pdf(
+                    resume,
+                    parallel=parallel_pages,
+                    profile=pdf_profile,
+                    max_pages=max_pages,
+                    deadline=extract_deadline,
+                )
+                text_raw, pages = extraction.text, extraction.pages
+                if extraction.truncated:
+                    violations.append(extraction.truncated)
+            else:
+                text_raw, pages = utils.extract_text(resume, ext), None
+    except BudgetExceeded as e:
+        record_violation(e.kind)
+        raise
+    if not text_raw:
+        if violations:
+            # the limit was hit before any text came out
+            record_violation(violations[0])
+            raise BudgetExceeded(violations[0], getattr(budget, violations[0]))
+        raise ValueError("Could not extract text from resume.")
+    return text_raw, pages, violations
+
+
+def _document(text_raw, budget, violations, nlp=None, chunk_chars=None):
+    # the text handed to spaCy is capped at the budget's max_chars
+    document = ResumeDocument(text_raw, nlp=nlp, max_chars=budget and budget.max_chars, chunk_chars=chunk_chars)
+    if document.truncated:
+        violations.append('max_chars')
+    return document
+
+
+def _name_matcher(nlp):
+    # spaCy is imported here rather than at module import: lite-mode
+    # parses and plain imports of the package never need it
+    from spacy.matcher import Matcher
+    return Matcher(nlp.vocab)
+
+
+def _first(values):
+    return values[0] if values else None
+
+
+def _extract_contact_tiered(document, custom_regex=None):
+    '''
+    Find the name, email and phone in the resume's header first, searching
+    the whole document (running full NER for the name) only for fields the
+    header lacks. Returns the values and the tier that found each of them,
+    'header' or 'document' (None when not found).
+    '''
+    header = document.header
+    tiers = [('header', header)]
+    if header is not document:
+        tiers.append(('document', document))
+
+    def mobile(doc):
+        if custom_regex:
+            return utils.extract_mobile_number(doc.text, custom_regex)
+        return _first(doc.fields['phone'])
+
+    finders = {
+        'name': utils.extract_person,
+        'email': lambda doc: _first(doc.fields['email']),
+        'mobile_number': mobile,
+    }
+    values = dict.fromkeys(finders)
+    sources = dict.fromkeys(finders)
+    for field, find in finders.items():
+        for tier, doc in tiers:
+            value = find(doc)
+            if value:
+                values[field], sources[field] = value, tier
+                break
+
+    if values['name'] is None:
+        # no PERSON entity anywhere: fall back to the header's first lines
+        values['name'] = utils.guess_name_from_lines(header.raw_text)
+        if values['name']:
+            sources['name'] = 'header'
+    return values, sources
+
+
+def _extract_details(document, pages, matcher, skills_file=None, custom_regex=None, tiered=False):
+    '''
+    Build the details dictionary for one resume from its ResumeDocument.
+    With `tiered`, the name and contact details come from the header when
+    it has them, and details['field_sources'] tells which tier found each.
+    '''
+    try:
+        skills = utils.extract_skills(document, skills_file=skills_file)
+        if tiered:
+            contact, sources = _extract_contact_tiered(document, custom_regex)
+            return dict(
+                contact,
+                skills=skills,
+                degree=utils.extract_degrees(document),
+                no_of_pages=pages,
+                field_sources=sources,
+            )
+
+        name = utils.extract_name(document, matcher=matcher)
+        # one scanner pass over the text finds emails, phones and degrees
+        email = _first(document.fields['email'])
+        if custom_regex:
+            mobile = utils.extract_mobile_number(document.text, custom_regex)
+        else:
+            mobile = _first(document.fields['phone'])
+        cust_ent = utils.extract_entities_wih_custom_model(document)
+
+        return {
+            # 'Name' is None when spaCy found no PERSON entity
+            'name': (cust_ent.get('Name') or [name])[0],
+            'email': email,
+            'mobile_number': mobile,
+            'skills': skills,
+            'degree': cust_ent.get('Degree', None),
+            'no_of_pages': pages,
+        }
+    except BudgetExceeded:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Failed to extract basic details: {e}")
+
+
+def _extract_details_lite(document, pages, skills_file=None, custom_regex=None):
+    '''
+    Build the details dictionary without spaCy: contact details and degrees
+    from the scanner, skills from the token index and the name guessed from
+    the first lines
+    '''
+    try:
+        if custom_regex:
+            mobile = utils.extract_mobile_number(document.text, custom_regex)
+        else:
+            mobile = _first(document.fields['phone'])
+        return {
+            'name': utils.guess_name_from_lines(document.raw_text),
+            'email': _first(document.fields['email']),
+            'mobile_number': mobile,
+            'skills': utils.extract_skills(document, skills_file=skills_file),
+            'degree': utils.extract_degrees(document),
+            'no_of_pages': pages,
+        }
+    except Exception as e:
+        raise RuntimeError(f"Failed to extract basic details: {e}")
+
+
+def _resolve_cache(cache):
+    # None selects the process-wide cache, False disables caching
+    if cache is None:
+        return default_cache()
+    return cache or None
+
+
+def _cacheable(violations):
+    # a timeout cuts a result short by chance, not by the budget alone
+    return not any(kind.endswith('_timeout') for kind in violations)
+
+
+# 'full' runs the spaCy model; 'lite' uses rules only and never loads it
+MODES = ('full', 'lite')
 
 
 class ResumeParser:
-    def __init__(self, resume, skills_file=None, custom_regex=None):
-        # Load the standard SpaCy model
-        try:
-            self.nlp_model = spacy.load('en_core_web_sm')
-        except Exception as e:
-            raise RuntimeError(f"Failed to load SpaCy model: {e}")
+    def __init__(self, resume, skills_file=None, custom_regex=None, cache=None, parallel_pages=False,
+                 pdf_profile=utils.DEFAULT_PDF_PROFILE, budget=None, text=None, tiered=False, chunk_chars=None,
+                 mode='full', fields=None, model=models.DEFAULT_MODEL):
+        # `text` is the resume's already extracted text, e.g. from an
+        # external converter; the file itself is then only used for caching.
+        # `tiered` runs NER over the header first, see _extract_contact_tiered.
+        # Texts longer than `chunk_chars` run through spaCy in chunks.
+        # `fields` (names or a models.PROFILES name) limits the spaCy
+        # components loaded to those these fields need; None loads all.
+        # `model` names the spaCy pipeline, as registered with models.
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+
+        # Shared SpaCy model, loaded once per process by the registry
+        exclude = models.excluded_pipes(fields)
+        self.nlp_model = models.get_model(model, exclude=exclude) if mode == 'full' else None
 
         self.__skills_file = skills_file
         self.__custom_regex = custom_regex
-        self.__matcher = Matcher(self.nlp_model.vocab)
+        self.__tiered = tiered
+        self.__mode = mode
+        self.__matcher = _name_matcher(self.nlp_model) if self.nlp_model is not None else None
         self.__details = {
             'name': None,
             'email': None,
@@ -29,48 +257,196 @@ class ResumeParser:
 
         self.__resume = resume
 
-        # Determine file extension
-        try:
-            if isinstance(self.__resume, io.BytesIO):
-                ext = self.__resume.name.split('.')[-1]
-            else:
-                ext = os.path.splitext(self.__resume)[1].split('.')[-1]
-        except Exception:
-            ext = 'pdf'  # fallback to PDF
+        # Identical uploads are answered from the result cache
+        self.__cache = _resolve_cache(cache)
+        cache_key = None
+        if self.__cache is not None:
+            cache_key = self.__cache.key_for(
+                resume, skills_file=skills_file, custom_regex=custom_regex, pdf_profile=pdf_profile, budget=budget,
+                tiered=tiered, chunk_chars=chunk_chars, mode=mode, exclude=exclude, model=model
+            )
+            cached = self.__cache.get(cache_key)
+            if cached is not None:
+                self.__details.update(cached)
+                return
 
         # Extract text
-        self.__text_raw = utils.extract_text(self.__resume, '.' + ext)
-        if not self.__text_raw:
-            raise ValueError("Could not extract text from resume.")
-
-        self.__text = ' '.join(self.__text_raw.split())
-        self.__nlp = self.nlp_model(self.__text)
-        self.__noun_chunks = list(self.__nlp.noun_chunks)
+        text_raw, self.__pages, violations = _read_resume(
+            self.__resume, parallel_pages, pdf_profile, budget, text
+        )
+        if mode == 'lite':
+            # nothing is sent to spaCy, so max_chars does not apply
+            self.__document = ResumeDocument(text_raw)
+        else:
+            self.__document = _document(text_raw, budget, violations, self.nlp_model, chunk_chars)
+        try:
+            with deadline(budget and budget.nlp_timeout, 'nlp_timeout'):
+                # spaCy runs while extracting, all of it under the nlp budget
+                self.__get_basic_details()
+        except BudgetExceeded as e:
+            record_violation(e.kind)
+            raise
 
-        self.__get_basic_details()
+        if violations:
+            # partial result: report which limits truncated the input
+            for kind in violations:
+                record_violation(kind)
+            self.__details['budget_exceeded'] = violations
+        if cache_key is not None and _cacheable(violations):
+            self.__cache.put(cache_key, self.__details)
 
     def get_extracted_data(self):
         return self.__details
 
     def __get_basic_details(self):
-        try:
-            name = utils.extract_name(self.__nlp, matcher=self.__matcher)
-            email = utils.extract_email(self.__text)
-            mobile = utils.extract_mobile_number(self.__text, self.__custom_regex)
-            skills = utils.extract_skills(self.__nlp, self.__noun_chunks, self.__skills_file)
-            cust_ent = utils.extract_entities_wih_custom_model(self.__nlp)
-            entities = utils.extract_entity_sections_grad(self.__text_raw)
-
-            # Populate details dictionary
-            self.__details['name'] = cust_ent.get('Name', [name])[0]
-            self.__details['email'] = email
-            self.__details['mobile_number'] = mobile
-            self.__details['skills'] = skills
-            self.__details['degree'] = cust_ent.get('Degree', None)
-            self.__details['no_of_pages'] = utils.get_number_of_pages(self.__resume)
+        if self.__mode == 'lite':
+            self.__details.update(_extract_details_lite(
+                self.__document, self.__pages, self.__skills_file, self.__custom_regex
+            ))
+            return
+        self.__details.update(_extract_details(
+            self.__document,
+            self.__pages,
+            self.__matcher,
+            self.__skills_file,
+            self.__custom_regex,
+            self.__tiered,
+        ))
 
+    @classmethod
+    def parse_many(cls, resumes, skills_file=None, custom_regex=None, batch_size=32, n_process=1, cache=None,
+                   pdf_profile=utils.DEFAULT_PDF_PROFILE, budget=None, chunk_chars=None, mode='full',
+                   fields=None, model=models.DEFAULT_MODEL):
+        '''
+        Parse many resumes, running spaCy over them in batches with nlp.pipe.
+        Returns one dictionary per resume, in input order, shaped like
+        get_extracted_data(); resumes that fail yield {'error', 'file'}.
+        A budget's nlp_timeout does not apply to batched NLP. Resumes longer
+        than `chunk_chars` are processed in chunks, outside the batches.
+        '''
+        return list(iter_parse_many(
+            resumes,
+            skills_file=skills_file,
+            custom_regex=custom_regex,
+            batch_size=batch_size,
+            n_process=n_process,
+            cache=cache,
+            pdf_profile=pdf_profile,
+            budget=budget,
+            chunk_chars=chunk_chars,
+            mode=mode,
+            fields=fields,
+            model=model,
+        ))
+
+
+def iter_parse_many(resumes, skills_file=None, custom_regex=None, batch_size=32, n_process=1, cache=None,
+                    pdf_profile=utils.DEFAULT_PDF_PROFILE, budget=None, chunk_chars=None, mode='full',
+                    fields=None, model=models.DEFAULT_MODEL):
+    '''
+    Generator form of ResumeParser.parse_many(). Text is extracted lazily,
+    so at most one spaCy batch of documents is held in memory at a time.
+    '''
+    if mode == 'lite':
+        # no spaCy batches to form: resumes are parsed one by one
+        for resume in resumes:
+            try:
+                yield ResumeParser(
+                    resume, skills_file=skills_file, custom_regex=custom_regex, cache=cache,
+                    pdf_profile=pdf_profile, budget=budget, mode='lite', model=model
+                ).get_extracted_data()
+            except Exception as e:
+                yield _error_result(e, resume)
+        return
+
+    exclude = models.excluded_pipes(fields)
+    nlp_model = models.get_model(model, exclude=exclude)
+    matcher = _name_matcher(nlp_model)
+    cache = _resolve_cache(cache)
+    # results known before NLP (cache hits and failures), by input index
+    ready = {}
+    # documents waiting for their doc, by input index. Only the index goes
+    # through nlp.pipe as context: with n_process > 1 contexts are pickled
+    # to the workers and back, and a document holds the pipeline.
+    pending = {}
+
+    def texts():
+        # yields (text, index) pairs; resumes answered without NLP are
+        # kept aside and reported in order when their placeholder comes back
+        for index, resume in enumerate(resumes):
+            cache_key = None
+            try:
+                if cache is not None:
+                    cache_key = cache.key_for(
+                        resume, skills_file=skills_file, custom_regex=custom_regex, pdf_profile=pdf_profile,
+                        budget=budget, tiered=False, chunk_chars=chunk_chars, mode='full',
+                        exclude=exclude, model=model
+                    )
+                    cached = cache.get(cache_key)
+                    if cached is not None:
+                        ready[index] = cached
+                        yield '', index
+                        continue
+                text_raw, pages, violations = _read_resume(resume, pdf_profile=pdf_profile, budget=budget)
+            except Exception as e:
+                ready[index] = _error_result(e, resume)
+                yield '', index
+                continue
+            document = _document(text_raw, budget, violations, nlp_model, chunk_chars)
+            pending[index] = (resume, document, pages, violations, cache_key)
+            # chunked documents run their own, bounded pipe when extracted
+            yield '' if document.chunked else document.nlp_text, index
+
+    docs = nlp_model.pipe(texts(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+    for doc, index in docs:
+        if index in ready:
+            yield ready.pop(index)
+            continue
+        resume, document, pages, violations, cache_key = pending.pop(index)
+        if not document.chunked:
+            document.set_doc(doc)
+        try:
+            details = _extract_details(document, pages, matcher, skills_file, custom_regex)
         except Exception as e:
-            raise RuntimeError(f"Failed to extract basic details: {e}")
+            yield {'error': str(e), 'file': _resume_label(resume)}
+            continue
+        if violations:
+            for kind in violations:
+                record_violation(kind)
+            details['budget_exceeded'] = violations
+        if cache_key is not None and _cacheable(violations):
+            cache.put(cache_key, details)
+        yield details
+
+
+def parse_batch(resumes, skills_file=None, custom_regex=None, batch_size=32, n_process=1, cache=None,
+                pdf_profile=utils.DEFAULT_PDF_PROFILE, budget=None, chunk_chars=None, mode='full', fields=None,
+                model=models.DEFAULT_MODEL):
+    return ResumeParser.parse_many(
+        resumes,
+        skills_file=skills_file,
+        custom_regex=custom_regex,
+        batch_size=batch_size,
+        n_process=n_process,
+        cache=cache,
+        pdf_profile=pdf_profile,
+        budget=budget,
+        chunk_chars=chunk_chars,
+        mode=mode,
+        fields=fields,
+        model=model,
+    )
+
+
+def _resume_label(resume):
+    return getattr(resume, 'name', resume)
+
+
+def _error_result(error, resume):
+    result = {'error': str(error), 'file': _resume_label(resume)}
+    if isinstance(error, BudgetExceeded):
+        result['budget_exceeded'] = [error.kind]
+    return result
 
 
 def resume_result_wrapper(resume):
@@ -78,29 +454,9 @@ def resume_result_wrapper(resume):
         parser = ResumeParser(resume)
         return parser.get_extracted_data()
     except Exception as e:
-        return {'error': str(e), 'file': resume}
+        return _error_result(e, resume)
 
 
 if __name__ == '__main__':
-    resumes_dir = 'resumes'
-    if not os.path.exists(resumes_dir):
-        raise FileNotFoundError("The 'resumes' folder was not found.")
-
-    resumes = []
-    for root, dirs, files in os.walk(resumes_dir):
-        for filename in files:
-            if filename.endswith(('.pdf', '.docx')):
-                resumes.append(os.path.join(root, filename))
-
-    pool = mp.Pool(mp.cpu_count())
-    results = [pool.apply_async(resume_result_wrapper, args=(r,)) for r in resumes]
-    pool.close()
-    pool.join()
-
-    output = [res.get() for res in results]
-
-    # Save or print results
-    with open("output.json", "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=4, ensure_ascii=False)
-
-    print("Extraction complete. Results saved to 'output.json'")
+    from . import batch
+    batch.main()
@@ -0,0 +1,110 @@
+# Author: Resume Analyzer Field Scanner
+#
+# Every pattern here runs in linear time: each one can only start where a
+# lookbehind or word boundary allows, and its repetitions cannot split the
+# same characters in more than one way, so a long run of junk (a base64
+# blob, a table border) is scanned once instead of once per character.
+
+import re
+from collections import namedtuple
+
+# One scanner match: `kind` is 'email', 'url', 'phone' or 'degree'
+Hit = namedtuple('Hit', ['kind', 'value', 'start', 'end'])
+
+KINDS = ('email', 'url', 'phone', 'degree')
+
+EMAIL_PATTERN = r'(?<![\w.%+-])[\w.%+-]+@[a-z0-9-]+(?:\.[a-z0-9-]+)+'
+
+# two-letter degrees only count dotted and in capitals (B.E., M.A.), as
+# 'ME' and 'MA' are words and state codes too
+_DEGREE_NAMES = (
+    r'bachelor|master|ph\.?d|doctorate|diploma|certificate'
+    r'|b\.?tech|m\.?tech|b\.?sc|m\.?sc|b\.?com|m\.?com|mba|bba'
+    r'|(?-i:[BM]\.[EA])'
+)
+
+URL_PATTERN = (
+    r'(?<![\w.@/-])(?:https?://|www\.)[^\s<>"\']+'
+    # bare links such as linkedin.com/in/name, but not degree lists such
+    # as B.Tech/M.Tech or B.Com/MBA
+    r'|(?<![\w.@/-])(?!(?:' + _DEGREE_NAMES + r')(?:\'?s)?\.?/)(?:[a-z0-9-]+\.)+[a-z]{2,}/[^\s<>"\']*'
+)
+
+# digits with optional separators, possibly opening with '+' or an area
+# code in parentheses; _is_phone() then checks the digit groups
+PHONE_PATTERN = r'(?<![\w+(])[+(]?\d[\d \-.()]{5,18}\d(?!\w)'
+
+DEGREE_PATTERN = r'\b(?:' + _DEGREE_NAMES + r")(?:'?s)?\b\.?"
+
+EMAIL = re.compile(EMAIL_PATTERN, re.IGNORECASE)
+PHONE = re.compile(PHONE_PATTERN)
+
+_SCANNER = re.compile(
+    '|'.join(
+        f'(?P<{kind}>{pattern})'
+        for kind, pattern in (
+            # emails first: their local part may look like a phone or degree
+            ('email', EMAIL_PATTERN),
+            ('url', URL_PATTERN),
+            ('phone', PHONE_PATTERN),
+            ('degree', DEGREE_PATTERN),
+        )
+    ),
+    re.IGNORECASE,
+)
+
+_DEGREE_SUFFIX = re.compile(r"'?s?\.?$")
+
+_DIGIT_GROUP = re.compile(r'\d+')
+_YEAR = re.compile(r'(?:19|20)\d\d')
+
+
+def _is_phone(value):
+    groups = _DIGIT_GROUP.findall(value)
+    # runs of years are date ranges, e.g. '2014 - 2018 2019'
+    if len(groups) > 1 and all(_YEAR.fullmatch(group) for group in groups):
+        return False
+    digits = sum(len(group) for group in groups)
+    # separated groups of under ten digits are mostly dates, e.g. '2014 - 2018'
+    return 10 <= digits <= 15 or (7 <= digits <= 15 and value.lstrip('+').isdigit())
+
+
+def _degree(value):
+    # 'Bachelors' -> 'bachelor', 'B.Tech.' -> 'b.tech'
+    return _DEGREE_SUFFIX.sub('', value.lower())
+
+
+def scan(text):
+    '''
+    Yield every email, URL, phone number and degree in `text` as Hits, in
+    document order, from a single pass of one compiled pattern
+    '''
+    for match in _SCANNER.finditer(text):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'phone':
+            value = value.strip()
+            if not _is_phone(value):
+                continue
+        elif kind == 'degree':
+            value = _degree(value)
+        yield Hit(kind, value, match.start(), match.end())
+
+
+def scan_fields(text):
+    '''
+    Return {kind: [values]} for `text`, each list in order of first
+    occurrence and without duplicates
+    '''
+    found = {kind: {} for kind in KINDS}
+    for hit in scan(text):
+        found[hit.kind].setdefault(hit.value, None)
+    return {kind: list(values) for kind, values in found.items()}
+
+
+def first_phone(text):
+    for match in PHONE.finditer(text):
+        value = match.group().strip()
+        if _is_phone(value):
+            return value
+    return None
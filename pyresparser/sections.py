@@ -0,0 +1,129 @@
+# Author: Resume Analyzer Section Segmentation
+
+import bisect
+import re
+from collections import namedtuple
+
+from . import constants as cs
+
+# One section of a resume: the body is text[start:end], and the heading
+# that opened it starts at heading_start
+Section = namedtuple('Section', ['name', 'heading_start', 'start', 'end'])
+
+# heading variant (lowercase, single-spaced) -> section name
+_HEADINGS = {
+    ' '.join(heading.lower().split()): name
+    for name, headings in cs.RESUME_SECTIONS.items()
+    for heading in headings
+}
+
+# longest variants first, so 'work experience' wins over 'experience'
+_ALTERNATION = '|'.join(
+    re.escape(heading).replace(r'\ ', r'[ \t]+')
+    for heading in sorted(_HEADINGS, key=len, reverse=True)
+)
+
+# a heading alone on its line, optionally bulleted and followed by a colon
+_LINE_HEADING = re.compile(
+    r'^[ \t]*(?:[#*•-][ \t]*)?(?P<heading>' + _ALTERNATION + r')[ \t]*[:\-]?[ \t]*$',
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# for text without line structure: a heading word anywhere
+_ANY_HEADING = re.compile(r'\b(?P<heading>' + _ALTERNATION + r')\b', re.IGNORECASE)
+
+
+class SectionIndex:
+    '''
+    Sections of one resume as spans over its text, in document order.
+    A section name may occur more than once (e.g. two 'experience' blocks).
+    '''
+
+    def __init__(self, text, sections):
+        self.text = text
+        self.sections = sections
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __contains__(self, name):
+        return any(section.name == name for section in self.sections)
+
+    def names(self):
+        return list(dict.fromkeys(section.name for section in self.sections))
+
+    def spans(self, name):
+        return [(section.start, section.end) for section in self.sections if section.name == name]
+
+    def get(self, name, default=None):
+        '''
+        Return the body text of section `name`, its blocks joined by
+        newlines, or `default` when the resume has no such section
+        '''
+        bodies = [self.text[start:end].strip() for start, end in self.spans(name)]
+        return '\n'.join(bodies) if bodies else default
+
+
+def _heading_name(heading):
+    return _HEADINGS[' '.join(heading.lower().split())]
+
+
+def segment(text):
+    '''
+    Split `text` into sections in a single pass. Headings are recognised on
+    lines of their own; text without any such line (e.g. whitespace-
+    normalized text) falls back to the first occurrence of each heading
+    word anywhere. Text before the first heading belongs to no section.
+    '''
+    matches = list(_LINE_HEADING.finditer(text))
+    if not matches:
+        seen = set()
+        for match in _ANY_HEADING.finditer(text):
+            name = _heading_name(match.group('heading'))
+            if name not in seen:
+                seen.add(name)
+                matches.append(match)
+
+    sections = []
+    for position, match in enumerate(matches):
+        end = matches[position + 1].start() if position + 1 < len(matches) else len(text)
+        sections.append(Section(_heading_name(match.group('heading')), match.start('heading'), match.end(), end))
+    return SectionIndex(text, sections)
+
+
+def _chunk_end(text, start, limit, heading_starts):
+    # latest good cut in the second half of text[start:limit]: a section
+    # start, else a paragraph break, a line break, a space, or the limit
+    lowest = start + (limit - start) // 2
+    position = bisect.bisect_right(heading_starts, limit) - 1
+    if position >= 0 and heading_starts[position] > lowest:
+        return heading_starts[position]
+    for separator in ('\n\n', '\n', ' '):
+        cut = text.rfind(separator, lowest, limit)
+        if cut != -1:
+            return cut + len(separator)
+    return limit
+
+
+def split_chunks(text, max_chars, index=None):
+    '''
+    Split `text` into consecutive pieces of at most `max_chars`, cutting at
+    section starts where possible, then at paragraph and line breaks and
+    spaces. The pieces joined together are `text` again.
+    '''
+    if len(text) <= max_chars:
+        return [text]
+    index = index if index is not None else segment(text)
+    heading_starts = [section.heading_start for section in index]
+
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        end = _chunk_end(text, start, start + max_chars, heading_starts)
+        chunks.append(text[start:end])
+        start = end
+    chunks.append(text[start:])
+    return chunks
@@ -0,0 +1,299 @@
+# Author: Resume Analyzer Skill Matching
+
+import csv
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+import threading
+
+# Skills and text are compared token by token: lowercase alphanumeric runs,
+# keeping trailing '+'/'#' so that 'c++' and 'c#' stay distinct from 'c'
+_TOKEN = re.compile(r'[a-z0-9]+[+#]*')
+
+# trie key marking the end of a skill phrase; never a valid token
+_END = ''
+
+
+def tokenize(text, lowered=False):
+    # `lowered` skips the lowercase copy for text that already is
+    return _TOKEN.findall(text if lowered else text.lower())
+
+
+class SkillMatcher:
+    '''
+    Token trie over a skills taxonomy. find() reports every skill phrase
+    that occurs on token boundaries ('go' does not match 'google', 'r' does
+    not match 'react') in one pass over the text's tokens, so matching cost
+    depends on the text length, not on the size of the taxonomy.
+    '''
+
+    def __init__(self, skills=(), aliases=None, categories=None):
+        self._trie = {}
+        self.size = 0
+        # skill -> category, for taxonomies that provide one
+        self.categories = dict(categories or {})
+        for skill in skills:
+            self.add(skill)
+        for alias, skill in (aliases or {}).items():
+            self.add(alias, skill)
+
+    def add(self, phrase, skill=None):
+        '''
+        Register `phrase`, reported as `skill` (default: the phrase itself)
+        '''
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if _END not in node:
+            self.size += 1
+        node[_END] = skill if skill is not None else phrase
+
+    def find(self, text):
+        '''
+        Return the skills found in `text` (a string or its tokens), in order
+        of first occurrence and without duplicates
+        '''
+        tokens = tokenize(text) if isinstance(text, str) else text
+        trie = self._trie
+        found = {}
+        count = len(tokens)
+        for start in range(count):
+            node = trie.get(tokens[start])
+            position = start + 1
+            while node is not None:
+                skill = node.get(_END)
+                if skill is not None:
+                    found.setdefault(skill, None)
+                if position == count:
+                    break
+                node = node.get(tokens[position])
+                position += 1
+        return list(found)
+
+    def phrases(self):
+        '''
+        Yield (phrase, skill) for every registered phrase, the phrase as
+        its tokens joined by spaces
+        '''
+        stack = [(self._trie, ())]
+        while stack:
+            node, tokens = stack.pop()
+            for token, child in node.items():
+                if token == _END:
+                    yield ' '.join(tokens), child
+                else:
+                    stack.append((child, tokens + (token,)))
+
+    def categorize(self, skills):
+        '''
+        Group `skills` by their taxonomy category ('Other' when unknown)
+        '''
+        grouped = {}
+        for skill in skills:
+            grouped.setdefault(self.categories.get(skill, 'Other'), []).append(skill)
+        return grouped
+
+
+def _split_aliases(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [alias.strip() for alias in re.split(r'[|;]', value) if alias.strip()]
+    return list(value)
+
+
+def read_taxonomy(path):
+    '''
+    Read a skills taxonomy as (skill, aliases, category) rows from
+      - CSV with a `skill` column and optional `aliases` ('|' or ';'
+        separated) and `category` columns, or
+      - JSON: a list of skill names, a list of {"skill", "aliases",
+        "category"} objects, or a {category: [skills]} mapping shaped like
+        constants.SKILL_CATEGORIES.
+    '''
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as fh:
+            return [
+                (row['skill'].strip(), _split_aliases(row.get('aliases')), (row.get('category') or '').strip() or None)
+                for row in csv.DictReader(fh)
+                if row.get('skill', '').strip()
+            ]
+
+    with open(path, encoding='utf-8') as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        return [(skill, [], category) for category, names in data.items() for skill in names]
+    rows = []
+    for entry in data:
+        if isinstance(entry, str):
+            rows.append((entry, [], None))
+        else:
+            rows.append((entry['skill'], _split_aliases(entry.get('aliases')), entry.get('category')))
+    return rows
+
+
+def compile_taxonomy(path):
+    '''
+    Build a SkillMatcher, with aliases and categories, from a taxonomy file
+    '''
+    matcher = SkillMatcher()
+    for skill, aliases, category in read_taxonomy(path):
+        matcher.add(skill)
+        for alias in aliases:
+            matcher.add(alias, skill)
+        if category:
+            matcher.categories[skill] = category
+    return matcher
+
+
+# bump when SkillMatcher's pickled layout changes
+INDEX_FORMAT = 1
+# per-user, as indexes are unpickled: never a directory others can write to
+DEFAULT_INDEX_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'pyresparser', 'skills'
+)
+
+# (abspath, mtime_ns, size) -> SkillMatcher, for this process
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_path(source, index_dir):
+    digest = hashlib.sha1(source.encode('utf-8')).hexdigest()
+    return os.path.join(index_dir, f'{digest}.pickle')
+
+
+def _trusted_dir(path):
+    # only this user may write to an index directory, or a planted pickle
+    # would run its code on load
+    if not hasattr(os, 'getuid'):
+        return True
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def _read_index(index_file, source_key):
+    if not _trusted_dir(os.path.dirname(index_file)):
+        return None
+    try:
+        with open(index_file, 'rb') as fh:
+            payload = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if payload.get('format') != INDEX_FORMAT or payload.get('source') != source_key:
+        return None
+    return payload['matcher']
+
+
+def _write_index(index_file, source_key, matcher):
+    # write to a temporary file first so concurrent workers never read a
+    # half-written index; an unwritable cache directory only costs speed
+    try:
+        os.makedirs(os.path.dirname(index_file), mode=0o700, exist_ok=True)
+        if not _trusted_dir(os.path.dirname(index_file)):
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(index_file), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            pickle.dump({'format': INDEX_FORMAT, 'source': source_key, 'matcher': matcher},
+                        fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_file)
+    except OSError:
+        pass
+
+
+def taxonomy_key(path):
+    # identifies one version of a taxonomy file
+    source = os.path.abspath(path)
+    st = os.stat(source)
+    return (source, st.st_mtime_ns, st.st_size)
+
+
+def load_skill_index(path, index_dir=DEFAULT_INDEX_DIR):
+    '''
+    Return the compiled SkillMatcher for the taxonomy at `path`. The
+    compiled index is pickled under `index_dir` and reused while the file's
+    mtime and size are unchanged, and kept in memory per path and mtime, so
+    each process compiles a taxonomy at most once.
+    '''
+    source_key = taxonomy_key(path)
+    source = source_key[0]
+
+    matcher = _indexes.get(source_key)
+    if matcher is not None:
+        return matcher
+
+    with _indexes_lock:
+        matcher = _indexes.get(source_key)
+        if matcher is None:
+            index_file = _index_path(source, index_dir) if index_dir else None
+            if index_file:
+                matcher = _read_index(index_file, source_key)
+            if matcher is None:
+                matcher = compile_taxonomy(source)
+                if index_file:
+                    _write_index(index_file, source_key, matcher)
+            _indexes[source_key] = matcher
+        return matcher
+
+
+def install_matcher(matcher, skills_file=None, source_key=None):
+    '''
+    Make `matcher`, e.g. one loaded from a bundle, the matcher that
+    matcher_for(skills_file) returns. For a taxonomy file, `source_key`
+    is the taxonomy_key() it was compiled from; it is only installed
+    while the file is unchanged. Returns whether it was installed.
+    '''
+    global _default_matcher
+    if skills_file is None:
+        with _default_lock:
+            _default_matcher = matcher
+        return True
+    source_key = tuple(source_key or ())
+    try:
+        if source_key != taxonomy_key(skills_file):
+            return False
+    except OSError:
+        return False
+    with _indexes_lock:
+        _indexes[source_key] = matcher
+    return True
+
+
+def matcher_for(skills_file=None):
+    '''
+    Return the matcher for `skills_file`, or the default taxonomy
+    '''
+    if skills_file:
+        return load_skill_index(skills_file)
+    return default_matcher()
+
+
+_default_matcher = None
+_default_lock = threading.Lock()
+
+
+def default_matcher():
+    '''
+    Return the matcher for constants.SKILLS, compiled once per process
+    '''
+    global _default_matcher
+    with _default_lock:
+        if _default_matcher is None:
+            from . import constants as cs
+            categories = {
+                skill: category
+                for category, names in cs.SKILL_CATEGORIES.items()
+                for skill in names
+            }
+            _default_matcher = SkillMatcher(cs.SKILLS, categories=categories)
+        return _default_matcher
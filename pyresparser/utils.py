@@ -3,103 +3,168 @@
 import io
 import os
 import re
-import nltk
-import pandas as pd
-import docx2txt
-from datetime import datetime
-from dateutil import relativedelta
-from . import constants as cs
-from pdfminer.converter import TextConverter
-from pdfminer.pdfinterp import PDFPageInterpreter
-from pdfminer.pdfinterp import PDFResourceManager
-from pdfminer.layout import LAParams
-from pdfminer.pdfpage import PDFPage
-from pdfminer.pdfparser import PDFSyntaxError
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import stopwords
-
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
-
-
-def extract_text_from_pdf(pdf_path):
-    '''
-    Helper function to extract the plain text from .pdf files
-    '''
-    if isinstance(pdf_path, str):
-        # for local pdf file
-        try:
-            with open(pdf_path, 'rb') as fh:
-                for page in PDFPage.get_pages(
+import shutil
+import tempfile
+import zipfile
+from collections import namedtuple
+from contextlib import contextmanager
+from xml.etree import ElementTree
+from . import converters
+from . import scanner
+from . import sections
+from . import skills
+from .budget import BudgetExceeded
+
+# pdfminer is imported by the PDF helpers on first use, so that importing
+# this module (and every .docx or rule-only parse) does not pay for it
+
+
+@contextmanager
+def _binary_stream(source):
+    '''
+    Helper context manager yielding a binary file object for a local path
+    or for an already open (e.g. uploaded) file object
+    '''
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fh:
+            yield fh
+    else:
+        yield source
+
+
+# PDF extraction profiles, from cheapest to most faithful to the layout:
+#   fast     - no layout analysis, text in content-stream order with
+#              breaks where the baseline moves and spaces at gaps
+#   balanced - line and box grouping without the boxes_flow reading order
+#   layout   - pdfminer's full default layout analysis
+PDF_PROFILES = ('fast', 'balanced', 'layout')
+DEFAULT_PDF_PROFILE = 'layout'
+
+
+def _pdf_laparams(profile):
+    from pdfminer.layout import LAParams
+
+    if profile == 'fast':
+        return None
+    if profile == 'balanced':
+        return LAParams(boxes_flow=None, detect_vertical=False, all_texts=False)
+    if profile == 'layout':
+        return LAParams()
+    raise ValueError(f"Unknown PDF profile: {profile!r} (expected one of {PDF_PROFILES})")
+
+
+def extract_text_from_pdf(pdf_path, pagenos=None, profile=DEFAULT_PDF_PROFILE, max_pages=None, deadline=None):
+    '''
+    Helper function to extract the plain text from .pdf files, page by page.
+    One resource manager (and its font cache), converter and interpreter
+    are shared by all pages of the document. `pagenos` limits extraction
+    to those zero-based page numbers; `profile` picks the layout analysis.
+    BudgetExceeded is raised before a page beyond `max_pages` is processed
+    or once the budget.Deadline `deadline` has passed.
+    '''
+    from pdfminer.converter import TextConverter
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFSyntaxError
+
+    laparams = _pdf_laparams(profile)
+    if laparams is None:
+        from ._pdftext import FastTextConverter as TextConverter
+    try:
+        with _binary_stream(pdf_path) as fh:
+            resource_manager = PDFResourceManager(caching=True)
+            fake_file_handle = io.StringIO()
+            converter = TextConverter(
+                resource_manager,
+                fake_file_handle,
+                codec='utf-8',
+                laparams=laparams
+            )
+            page_interpreter = PDFPageInterpreter(
+                resource_manager,
+                converter
+            )
+            try:
+                for index, page in enumerate(PDFPage.get_pages(
                         fh,
+                        pagenos=pagenos,
                         caching=True,
                         check_extractable=True
-                ):
-                    resource_manager = PDFResourceManager()
-                    fake_file_handle = io.StringIO()
-                    converter = TextConverter(
-                        resource_manager,
-                        fake_file_handle,
-                        codec='utf-8',
-                        laparams=LAParams()
-                    )
-                    page_interpreter = PDFPageInterpreter(
-                        resource_manager,
-                        converter
-                    )
+                )):
+                    if max_pages is not None and index >= max_pages:
+                        raise BudgetExceeded('max_pages', max_pages)
+                    if deadline is not None:
+                        deadline.check()
                     page_interpreter.process_page(page)
+                    yield fake_file_handle.getvalue()
 
-                    text = fake_file_handle.getvalue()
-                    yield text
-
-                    # close open handles
-                    converter.close()
-                    fake_file_handle.close()
-        except PDFSyntaxError:
-            return
-    else:
-        # extract text from remote pdf file
-        try:
-            for page in PDFPage.get_pages(
-                    pdf_path,
-                    caching=True,
-                    check_extractable=True
-            ):
-                resource_manager = PDFResourceManager()
-                fake_file_handle = io.StringIO()
-                converter = TextConverter(
-                    resource_manager,
-                    fake_file_handle,
-                    codec='utf-8',
-                    laparams=LAParams()
-                )
-                page_interpreter = PDFPageInterpreter(
-                    resource_manager,
-                    converter
-                )
-                page_interpreter.process_page(page)
-
-                text = fake_file_handle.getvalue()
-                yield text
-
+                    # reuse the buffer for the next page
+                    fake_file_handle.seek(0)
+                    fake_file_handle.truncate(0)
+            finally:
                 # close open handles
                 converter.close()
                 fake_file_handle.close()
-        except PDFSyntaxError:
-            return
+    except PDFSyntaxError:
+        return
+
+
+# WordprocessingML tags read by the .docx extractor
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P, _W_T, _W_TAB, _W_BR, _W_CR = _W + 'p', _W + 't', _W + 'tab', _W + 'br', _W + 'cr'
+_DOCX_HEADER = re.compile(r'word/header\d*\.xml$')
+_DOCX_FOOTER = re.compile(r'word/footer\d*\.xml$')
+
+# Result of a .docx extraction: paragraph (start, end) offsets into text
+DocxExtraction = namedtuple('DocxExtraction', ['text', 'paragraphs'])
+
+
+def _iter_docx_paragraphs(part):
+    '''
+    Helper function to stream the paragraphs of one WordprocessingML part,
+    clearing each parsed paragraph so memory stays flat on long documents
+    '''
+    # paragraphs can nest (text boxes, tables in cells), so keep a stack
+    stack = []
+    for event, elem in ElementTree.iterparse(part, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            if tag == _W_P:
+                stack.append([])
+            continue
+        if tag == _W_P:
+            yield ''.join(stack.pop())
+            elem.clear()
+        elif stack:
+            if tag == _W_T:
+                stack[-1].append(elem.text or '')
+            elif tag == _W_TAB:
+                stack[-1].append('\t')
+            elif tag in (_W_BR, _W_CR):
+                stack[-1].append('\n')
+
+
+def extract_docx(docx_path):
+    '''
+    Helper function to extract the text of a .docx file with its paragraph
+    boundaries. Only the headers, the main document and the footers are
+    read from the zip package; embedded media is never decompressed.
+    '''
+    paragraphs = []
+    spans = []
+    offset = 0
+    with zipfile.ZipFile(docx_path) as package:
+        names = package.namelist()
+        parts = sorted(name for name in names if _DOCX_HEADER.match(name))
+        parts.append('word/document.xml')
+        parts.extend(sorted(name for name in names if _DOCX_FOOTER.match(name)))
+        for name in parts:
+            with package.open(name) as part:
+                for paragraph in _iter_docx_paragraphs(part):
+                    paragraphs.append(paragraph)
+                    spans.append((offset, offset + len(paragraph)))
+                    offset += len(paragraph) + 1
+    return DocxExtraction('\n'.join(paragraphs), spans)
 
 
 def extract_text_from_docx(docx_path):
@@ -107,35 +172,167 @@ def extract_text_from_docx(docx_path):
     Helper function to extract plain text from .docx files
     '''
     try:
-        text = docx2txt.process(docx_path)
-        return text
+        return extract_docx(docx_path).text
+    except BudgetExceeded:
+        raise
     except Exception:
         return ''
 
 
+@contextmanager
+def _local_path(source, suffix):
+    '''
+    Helper context manager yielding a filesystem path for `source`. In-memory
+    uploads are spilled to a unique temporary file, removed afterwards.
+    '''
+    if isinstance(source, (str, os.PathLike)):
+        yield source
+        return
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            if isinstance(source, io.BytesIO):
+                fh.write(source.getbuffer())
+            else:
+                source.seek(0)
+                shutil.copyfileobj(source, fh)
+        yield path
+    finally:
+        os.remove(path)
+
+
 def extract_text_from_doc(doc_path):
     '''
-    Helper function to extract plain text from .doc files
+    Helper function to extract plain text from .doc files with antiword,
+    run through the shared converter pool (bounded, with a timeout).
+    Failures return '' and are counted in converters.default_pool().
     '''
     try:
-        import subprocess
-        cmd = ['antiword', doc_path]
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        stdout, stderr = proc.communicate()
-        return stdout.decode('utf-8')
+        with _local_path(doc_path, '.doc') as path:
+            return converters.default_pool().convert(path).text
+    except BudgetExceeded:
+        raise
     except Exception:
         return ''
 
 
-def extract_text(file_path, extension):
+# Result of a single pass over a PDF
+PdfExtraction = namedtuple('PdfExtraction', ['text', 'pages', 'page_lengths', 'truncated'])
+
+
+# Long PDFs split across processes (see extract_pdf)
+PARALLEL_PAGE_THRESHOLD = 20
+_page_executor = None
+_page_executor_workers = None
+
+
+def _extract_page_range(source, first, last, profile):
+    # process pool task: `source` is a local path or the PDF bytes
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    return list(extract_text_from_pdf(source, pagenos=set(range(first, last)), profile=profile))
+
+
+def _get_page_executor(workers):
+    global _page_executor, _page_executor_workers
+    if _page_executor is None or _page_executor_workers != workers:
+        from concurrent.futures import ProcessPoolExecutor
+        if _page_executor is not None:
+            _page_executor.shutdown(wait=False)
+        _page_executor = ProcessPoolExecutor(workers)
+        _page_executor_workers = workers
+    return _page_executor
+
+
+def _extract_pages_parallel(pdf_path, page_threshold, workers, profile, max_pages=None, deadline=None):
+    '''
+    Helper function to extract the pages of a long PDF in a process pool.
+    Returns (pages, truncated), or None when the document is below
+    `page_threshold` pages or when running inside a daemonic pool worker,
+    which cannot start processes. Page ranges not finished by the
+    budget.Deadline `deadline` are dropped, with the ones after them.
+    '''
+    import multiprocessing as mp
+    from concurrent.futures import TimeoutError as FutureTimeout
+    if mp.current_process().daemon:
+        return None
+
+    count = get_number_of_pages(pdf_path)
+    if not count or count < page_threshold:
+        return None
+    truncated = None
+    if max_pages is not None and count > max_pages:
+        count, truncated = max_pages, 'max_pages'
+
+    workers = workers or os.cpu_count() or 1
+    if isinstance(pdf_path, (str, os.PathLike)):
+        source = pdf_path
+    elif isinstance(pdf_path, io.BytesIO):
+        source = pdf_path.getvalue()
+    else:
+        pdf_path.seek(0)
+        source = pdf_path.read()
+
+    step = -(-count // workers)
+    executor = _get_page_executor(workers)
+    futures = [
+        executor.submit(_extract_page_range, source, first, min(first + step, count), profile)
+        for first in range(0, count, step)
+    ]
+    pages = []
+    try:
+        for future in futures:
+            timeout = deadline.remaining() if deadline is not None else None
+            try:
+                pages.extend(future.result(timeout=timeout))
+            except FutureTimeout:
+                raise BudgetExceeded(deadline.kind, deadline.seconds)
+    except BudgetExceeded as e:
+        # raised on timeout, or by SIGALRM while waiting in the main thread;
+        # keep the leading page ranges that finished in time
+        for future in futures:
+            future.cancel()
+        truncated = e.kind
+    return pages, truncated
+
+
+def extract_pdf(pdf_path, parallel=False, page_threshold=PARALLEL_PAGE_THRESHOLD, workers=None,
+                profile=DEFAULT_PDF_PROFILE, max_pages=None, deadline=None):
+    '''
+    Helper function to extract the text, the page count and the length of
+    each page's text of a .pdf file in a single pass over its pages.
+    With `parallel`, documents of at least `page_threshold` pages are split
+    into page ranges extracted by `workers` processes, in page order.
+    `profile` is one of PDF_PROFILES.
+
+    Only the first `max_pages` pages are read, and a budget.Deadline stops
+    extraction between pages; either way the pages read so far are returned
+    and `truncated` names the limit that was hit.
+    '''
+    result = None
+    if parallel:
+        result = _extract_pages_parallel(pdf_path, page_threshold, workers, profile, max_pages, deadline)
+    if result is not None:
+        pages, truncated = result
+    else:
+        pages, truncated = [], None
+        try:
+            for page in extract_text_from_pdf(pdf_path, profile=profile, max_pages=max_pages, deadline=deadline):
+                pages.append(page)
+        except BudgetExceeded as e:
+            truncated = e.kind
+    text = ' ' + ' '.join(pages) if pages else ''
+    return PdfExtraction(text, len(pages), [len(page) for page in pages], truncated)
+
+
+def extract_text(file_path, extension, pdf_profile=DEFAULT_PDF_PROFILE):
     '''
     Wrapper function to detect the file extension and call text
     extraction function accordingly
     '''
     text = ''
     if extension == '.pdf':
-        for page in extract_text_from_pdf(file_path):
-            text += ' ' + page
+        text = extract_pdf(file_path, profile=pdf_profile).text
     elif extension == '.docx':
         text = extract_text_from_docx(file_path)
     elif extension == '.doc':
@@ -144,47 +341,70 @@ def extract_text(file_path, extension):
 
 
 def get_number_of_pages(file_name):
+    if isinstance(file_name, (str, os.PathLike)) and not str(file_name).lower().endswith('.pdf'):
+        return None
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFSyntaxError
+
     try:
-        if isinstance(file_name, io.BytesIO):
-            # for remote pdf file
+        with _binary_stream(file_name) as fh:
             count = 0
             for page in PDFPage.get_pages(
-                        file_name,
-                        caching=True,
-                        check_extractable=True
+                    fh,
+                    caching=True,
+                    check_extractable=True
             ):
                 count += 1
             return count
-        else:
-            # for local pdf file
-            if file_name.endswith('.pdf'):
-                count = 0
-                with open(file_name, 'rb') as fh:
-                    for page in PDFPage.get_pages(
-                            fh,
-                            caching=True,
-                            check_extractable=True
-                    ):
-                        count += 1
-                return count
-            else:
-                return None
     except PDFSyntaxError:
         return None
 
 
+def _raw_text(nlp_text):
+    # a ResumeDocument keeps the line breaks that its normalized text drops
+    return getattr(nlp_text, 'raw_text', None) or nlp_text.text
+
+
+def _education_text(nlp_text):
+    # a ResumeDocument has its sections indexed already
+    section_text = getattr(nlp_text, 'section_text', None)
+    if section_text is not None:
+        return section_text('education')
+    return sections.segment(nlp_text.text).get('education')
+
+
+def _scanned_fields(nlp_text):
+    # a ResumeDocument has scanned its text already
+    fields = getattr(nlp_text, 'fields', None)
+    return fields if fields is not None else scanner.scan_fields(nlp_text.text)
+
+
 def extract_name(nlp_text, matcher=None):
     '''
-    Helper function to extract name from spacy nlp text
+    Helper function to extract name from spacy nlp text or a ResumeDocument
     Uses simple entity recognition instead of complex patterns
     '''
     # Primary method: Use spaCy's built-in named entity recognition
+    # Fallback method: Look for capitalized words at the beginning
+    return extract_person(nlp_text) or guess_name_from_lines(_raw_text(nlp_text))
+
+
+def extract_person(nlp_text):
+    '''
+    Helper function to return the first PERSON entity, or None
+    '''
     for ent in nlp_text.ents:
         if ent.label_ == "PERSON":
             return ent.text
+    return None
 
-    # Fallback method: Look for capitalized words at the beginning
-    text_lines = nlp_text.text.split('\n')
+
+def guess_name_from_lines(text):
+    '''
+    Helper function to guess the name from the first lines of a resume,
+    without NLP: the first two capitalized words opening a line
+    '''
+    text_lines = text.split('\n')
     for line in text_lines[:10]:  # Check first 10 lines
         line = line.strip()
         if line and not any(keyword in line.lower() for keyword in ['email', 'phone', 'address', 'objective', 'summary']):
@@ -201,55 +421,46 @@ def extract_email(text):
     '''
     Helper function to extract email id from text
     '''
-    email = re.findall(r"([^@|\s]+@[^@]+\.[^@|\s]+)", text)
+    email = scanner.EMAIL.search(text)
     if email:
-        try:
-            return email[0].split()[0].strip(';')
-        except IndexError:
-            return None
+        return email.group()
+    return None
 
 
 def extract_mobile_number(text, custom_regex=None):
     '''
     Helper function to extract mobile number from text
     '''
-    if custom_regex:
-        mob_num = re.findall(custom_regex, text)
-    else:
-        mob_num = re.findall(r'[\+]?[1-9]?[0-9]{7,14}', text)
-    
+    if not custom_regex:
+        return scanner.first_phone(text)
+
+    mob_num = re.findall(custom_regex, text)
     if mob_num:
         return mob_num[0]
     return None
 
 
-def extract_skills(nlp_text, noun_chunks, skills_file=None):
+def extract_skills(nlp_text, noun_chunks=None, skills_file=None):
     '''
-    Helper function to extract skills from spacy nlp text
+    Helper function to extract skills from spacy nlp text or a
+    ResumeDocument, matching the taxonomy in `skills_file` (default:
+    constants.SKILLS) on token boundaries with its compiled skill index.
+    `noun_chunks` is unused and kept for backwards compatibility.
     '''
-    tokens = [token.text for token in nlp_text if not token.is_stop]
-    
-    # Default skills list
-    default_skills = [
-        'python', 'java', 'javascript', 'html', 'css', 'sql', 'mysql', 'postgresql',
-        'mongodb', 'react', 'angular', 'vue', 'node', 'express', 'django', 'flask',
-        'spring', 'hibernate', 'git', 'docker', 'kubernetes', 'aws', 'azure', 'gcp',
-        'machine learning', 'deep learning', 'data science', 'artificial intelligence',
-        'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy', 'matplotlib',
-        'tableau', 'power bi', 'excel', 'r', 'scala', 'spark', 'hadoop', 'kafka',
-        'redis', 'elasticsearch', 'jenkins', 'ci/cd', 'agile', 'scrum', 'jira',
-        'photoshop', 'illustrator', 'figma', 'sketch', 'ui/ux', 'wireframing',
-        'prototyping', 'user research', 'usability testing'
-    ]
-    
-    skills = []
-    text_lower = nlp_text.text.lower()
-    
-    for skill in default_skills:
-        if skill.lower() in text_lower:
-            skills.append(skill)
-    
-    return list(set(skills))
+    tokens = getattr(nlp_text, 'skill_tokens', None)
+    return skills.matcher_for(skills_file).find(tokens if tokens is not None else nlp_text.text)
+
+
+def extract_degrees(nlp_text):
+    '''
+    Helper function to extract degrees, from the education section first;
+    mentions elsewhere ('Certified Scrum Master') are mostly noise
+    '''
+    education = _education_text(nlp_text)
+    degrees = scanner.scan_fields(education)['degree'] if education else []
+    if not degrees:
+        degrees = _scanned_fields(nlp_text)['degree']
+    return degrees or None
 
 
 def extract_entities_wih_custom_model(nlp_text):
@@ -257,21 +468,9 @@ def extract_entities_wih_custom_model(nlp_text):
     Helper function to extract entities with custom model
     '''
     entities = {}
-    
+
     # Extract degree information
-    degree_patterns = [
-        r'bachelor', r'master', r'phd', r'doctorate', r'diploma', r'certificate',
-        r'b\.?tech', r'b\.?e', r'm\.?tech', r'm\.?e', r'b\.?sc', r'm\.?sc',
-        r'b\.?com', r'm\.?com', r'b\.?a', r'm\.?a', r'mba', r'bba'
-    ]
-    
-    degrees = []
-    text_lower = nlp_text.text.lower()
-    for pattern in degree_patterns:
-        matches = re.findall(pattern, text_lower)
-        degrees.extend(matches)
-    
-    entities['Degree'] = list(set(degrees)) if degrees else None
+    entities['Degree'] = extract_degrees(nlp_text)
     
     # Extract name (fallback)
     names = []
@@ -289,15 +488,10 @@ def extract_entity_sections_grad(text):
     Helper function to extract entity sections
     '''
     entities = {}
-    
+
     # Extract education section
-    education_section = re.search(
-        r'education.*?(?=experience|skills|projects|$)',
-        text.lower(),
-        re.DOTALL
-    )
-    
-    if education_section:
-        entities['education'] = education_section.group()
-    
+    education = sections.segment(text).get('education')
+    if education is not None:
+        entities['education'] = education.lower()
+
     return entities